@@ -4,10 +4,55 @@ Utils for interfacing to MPI libraries using mpi4py and dask
 
 __version__ = "0.1.4"
 
-from . import abc
-from .lib import *
-from .client import *
-from .comm import *
-from .distributed import *
-from .cartesian import *
-from .cart_array import *
+from importlib import import_module
+
+# The submodule lib gives the MPI functions, loading cppyy on first use
+from . import lib
+from .lib import get_lib, default_comm, initialized, finalized
+from .instrument import Stats, stats
+
+# The other attributes are loaded on first use (PEP 562), such that
+# dask, distributed and cppyy are imported only if needed.
+LAZY = {
+    "abc": None,
+    "default_client": "client",
+    "Client": "client",
+    "Comm": "comm",
+    "CartComm": "comm",
+    "isdistributed": "distributed",
+    "anydistributed": "distributed",
+    "Distributed": "distributed",
+    "Local": "distributed",
+    "DistributedClass": "distributed",
+    "results": "distributed",
+    "DistributedError": "distributed",
+    "CommLocal": "cartesian",
+    "Cartesian": "cartesian",
+    "CartesianClass": "cartesian",
+}
+
+__all__ = [
+    "lib",
+    "get_lib",
+    "default_comm",
+    "initialized",
+    "finalized",
+    "Stats",
+    "stats",
+] + [key for key, val in LAZY.items() if val]
+
+
+def __getattr__(key):
+    "Imports the submodule of key on first use"
+    if key not in LAZY:
+        raise AttributeError(f"module {__name__} has no attribute {key}")
+    if LAZY[key] is None:
+        return import_module(f".{key}", __name__)
+    value = getattr(import_module(f".{LAZY[key]}", __name__), key)
+    globals()[key] = value
+    return value
+
+
+def __dir__():
+    "Includes the lazy attributes"
+    return sorted(set(globals()) | set(LAZY))
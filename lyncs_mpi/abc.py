@@ -4,6 +4,7 @@ Some ABC to be used for typing parallel classes
 # pylint: disable=too-few-public-methods
 
 __all__ = [
+    "Pure",
     "Result",
     "Global",
     "Array",
@@ -14,12 +15,35 @@ from functools import partial
 from numpy import ndarray
 from dask.array import Array as daskArray
 from dask.array import from_array
-from .distributed import results, Distributed
+from dask.array.core import normalize_chunks
+from lyncs_utils import select_kwargs
+from .distributed import results, then, Distributed
 from .cartesian import Cartesian
 
 
+class Pure(ABC):
+    """
+    Marks the remote call as pure: identical calls share the same futures.
+    It can wrap another annotation, e.g. `Pure(Global)`, to be applied to the result.
+    """
+
+    pure = True
+
+    def __new__(cls, *args, finalize=None, **kwargs):
+        assert len(args) == 1
+        arg = args[0]
+        if not isinstance(arg, Distributed):
+            return partial(cls, finalize=arg)
+        if finalize is None:
+            return arg
+        return select_kwargs(finalize, arg, **kwargs)
+
+
 class Result(ABC):
-    "Returns a tuple with the result of the remote calls"
+    """
+    Returns a tuple with the result of the remote calls.
+    If the client is asynchronous, this and the derived finalizers return an awaitable.
+    """
 
     def __new__(cls, ftrs, **kwargs):
         return results(*ftrs)
@@ -29,7 +53,11 @@ class Global(Result):
     "Returns a single value supposed to be the same result for all the remote calls"
 
     def __new__(cls, ftrs, **kwargs):
-        res = super().__new__(cls, ftrs)
+        return then(super().__new__(cls, ftrs), cls._check_global)
+
+    @staticmethod
+    def _check_global(res):
+        "Returns the global value of the results"
         ret = res[0]
         if not all((_ == ret for _ in res)):
             raise RuntimeError(f"Expected global value but got different resuts: {res}")
@@ -45,6 +73,11 @@ class Constant(Global):
             caller, Distributed
         ), "Expected a Distributed caller. Got {caller}"
         ret = super().__new__(cls, ftrs, caller=caller, key=key, **kwargs)
+        return then(ret, partial(cls._store, caller, key))
+
+    @staticmethod
+    def _store(caller, key, ret):
+        "Stores the constant value in the caller"
         caller._constants[key] = ret
         return ret
 
@@ -81,11 +114,12 @@ class Array(Result):
                 f"Not compatible shape. Got {arg.shape} but expected {shape}"
             )
         chunks = array_kwargs.get("chunks", kwargs["caller"].comm.get_chunks(shape))
+        chunks = normalize_chunks(chunks, shape, dtype=arg.dtype)
 
         if isinstance(arg, ndarray):
             return from_array(arg, chunks=chunks)
 
-        if arg.chunksize != chunks:
+        if arg.chunks != chunks:
             return arg.rechunk(chunks)
         return arg
 
@@ -4,12 +4,17 @@ __all__ = [
     "CartComm",
 ]
 
-from math import ceil
+from operator import getitem
+from itertools import product
+import numpy
+from dask.base import tokenize
 from dask.core import flatten
 from dask.array import Array, zeros, ones, empty, full
 from dask.array.core import normalize_chunks
+from dask.distributed import Future, wait
 from lyncs_utils import add_to
 from .comm import CartComm
+from .distributed import Distributed
 
 
 class KeyPatch(tuple):
@@ -39,10 +44,18 @@ def check_dims(self, nchunks):
         )
 
 
+def _identity(arr):
+    "Auxiliary function used by get_futures for moving a chunk"
+    return arr
+
+
 @add_to(CartComm)
 def get_futures(self, arr):
     """
     Return the list of futures of a Dask array associated to a cartesian communicator.
+    If the chunks are already in memory, their futures are returned as they are
+    and only the chunks on the wrong worker are moved. Otherwise the array is
+    persisted on the workers.
 
     Parameters
     ----------
@@ -55,21 +68,49 @@ def get_futures(self, arr):
 
     self.check_dims(tuple(len(chunks) for chunks in arr.chunks))
 
-    idxs, _ = zip(*self.normalize_dims())
-    coords = self.normalize_coords()
+    idxs = tuple(idx for idx, _ in self.normalize_dims())
+    coords = self._get_index("normalize_coords")
     keys = tuple(flatten(arr.__dask_keys__()))
     key_idx = {}
     for key in keys:
         coord = tuple(key[_i + 1] for _i in idxs)
-        key_idx[key] = coords.index(coord)
+        key_idx[key] = coords[coord]
 
     keys = sorted(keys, key=key_idx.__getitem__)
-    restrictions = {KeyPatch(key): worker for key, worker in zip(keys, self.workers)}
+    workers = self._resolved("workers")
+    metas = [
+        (arr.dtype, tuple(chunks[_b] for chunks, _b in zip(arr.chunks, key[1:])))
+        for key in keys
+    ]
+
+    # Chunks already in memory are used in place and only the misplaced ones are moved
+    futures = [arr.dask.get(key) for key in keys]
+    if all(isinstance(future, Future) for future in futures):
+        wait(futures)
+        who_has = self.client.who_has(futures, overload=False)
+
+        def located(key):
+            # some versions of distributed return the keys as strings
+            return who_has.get(key, who_has.get(str(key), ()))
+
+        for idx, (future, worker) in enumerate(zip(futures, workers)):
+            if worker not in located(future.key):
+                futures[idx] = self.client.submit(
+                    _identity, future, workers=worker, pure=False
+                )
+                self.client.set_owners([futures[idx]], [worker])
+        self.client.set_array_meta(futures, metas)
+        return futures
+
+    restrictions = {KeyPatch(key): worker for key, worker in zip(keys, workers)}
 
     arr = arr.persist(workers=restrictions)
     assert len(self) == len(arr.dask.values())
 
-    return list(arr.dask[key] for key in keys)
+    futures = list(arr.dask[key] for key in keys)
+    self.client.set_owners(futures, workers)
+    self.client.set_array_meta(futures, metas)
+    return futures
 
 
 @add_to(CartComm)
@@ -97,8 +138,9 @@ def array(self, futures, shape=None, chunks=None, dtype=None):
         raise ValueError("futures and cart must have the same length")
 
     if chunks is None or dtype is None:
-        infos = self.client.map(lambda arr: (arr.dtype, arr.shape), futures)
-        infos = tuple(_.result() for _ in infos)
+        if not isinstance(futures, Distributed):
+            futures = Distributed(futures)
+        infos = futures.array_meta
 
         if dtype is None:
             dtype = infos[0][0]
@@ -108,28 +150,28 @@ def array(self, futures, shape=None, chunks=None, dtype=None):
             )
 
         if chunks is None:
-            chunks = infos[0][1]
-            if not all((chunks == chn for (_, chn) in infos)):
-                # TODO: normalize chunks using shape
-                raise NotImplementedError(
-                    "Futures with non-uniform chunks not supported yet"
-                )
+            chunks = self.get_chunks_of(tuple(shp for (_, shp) in infos))
 
     if shape is None:
-        shape = list(chunks)
-        for _i, _l in self.normalize_dims():
-            shape[_i] *= _l
+        if all(isinstance(chunk, tuple) for chunk in chunks):
+            shape = tuple(map(sum, chunks))
+        else:
+            shape = list(chunks)
+            for _i, _l in self.normalize_dims():
+                shape[_i] *= _l
 
     chunks = normalize_chunks(chunks, shape, dtype=dtype)
 
     self.check_dims(tuple(len(chunk) for chunk in chunks))
 
     dask = {}
-    idxs, _ = zip(*self.normalize_dims())
+    metas = []
+    idxs = tuple(idx for idx, _ in self.normalize_dims())
     for coords, future in zip(self.normalize_coords(), futures):
         key = [0] * len(shape)
         for _i, _c in zip(idxs, coords):
             key[_i] = _c
+        metas.append((dtype, tuple(chunk[_b] for chunk, _b in zip(chunks, key))))
 
         name = next(iter(futures)).key
         if isinstance(name, tuple):
@@ -138,20 +180,46 @@ def array(self, futures, shape=None, chunks=None, dtype=None):
         key = (name,) + tuple(key)
         dask[key] = future
 
+    self.client.set_array_meta(dask.values(), metas)
     return Array(dask, next(iter(dask.keys()))[0], chunks, dtype=dtype, shape=shape)
 
 
+@add_to(CartComm)
+def get_chunks_of(self, shapes):
+    "Returns the chunks of an array given the local shapes of each rank"
+    if not len(shapes) == len(self):
+        raise ValueError("shapes and cart must have the same length")
+    ndim = len(shapes[0])
+    if not all(len(shape) == ndim for shape in shapes):
+        raise ValueError(f"Futures have different number of dimensions {shapes}")
+
+    dims = dict(self.normalize_dims())
+    chunks = []
+    for axis in range(ndim):
+        sizes = {}
+        for coord, shape in zip(self.coords, shapes):
+            idx = coord[axis] if axis in dims else 0
+            if sizes.setdefault(idx, shape[axis]) != shape[axis]:
+                raise ValueError(f"Futures have incompatible shapes on axis {axis}")
+        chunks.append(tuple(sizes[idx] for idx in range(len(sizes))))
+    return tuple(chunks)
+
+
 @add_to(CartComm)
 def get_chunks(self, shape):
-    "Returns the chunks of shape compatible with the CartComm"
-    chunks = list(shape)
+    """
+    Returns the chunks of shape compatible with the CartComm.
+    The distributed axes are split in balanced blocks, i.e. the local sizes
+    differ by at most one element, as [n // p + (i < n % p) for i in range(p)].
+    """
+    chunks = [(_l,) for _l in shape]
     for _i, _l in self.normalize_dims():
         if _i >= len(shape):
             raise ValueError("Array shape smaller than distributed axes")
         if _l > shape[_i]:
             raise ValueError(f"Cannot chunk shape on axis {_i} in {_l} pieces")
-        chunks[_i] = ceil(chunks[_i] / _l)
-    return chunks
+        chunks[_i] = tuple(shape[_i] // _l + (_j < shape[_i] % _l) for _j in range(_l))
+    return tuple(chunks)
 
 
 def array_wrapper(mth):
@@ -170,24 +238,555 @@ def array_wrapper(mth):
 
     def wrapper(self, shape, **kwargs):
         chunks = self.get_chunks(shape)
+        workers = self._resolved("workers")
+        if "name" not in kwargs:
+            # The workers are part of the name, otherwise the same array
+            # on another communicator would share the keys with this one
+            token = tokenize(shape, chunks, workers, **kwargs)
+            kwargs["name"] = f"{mth.__name__}-{token}"
         arr = mth(shape, chunks=chunks, **kwargs)
 
-        idxs, _ = zip(*self.normalize_dims())
-        coords = self.normalize_coords()
-        workers = self.workers
+        idxs = tuple(idx for idx, _ in self.normalize_dims())
+        coords = self._get_index("normalize_coords")
         keys = flatten(arr.__dask_keys__())
         restrictions = {}
         for key in keys:
             coord = tuple(key[_i + 1] for _i in idxs)
-            restrictions[KeyPatch(key)] = workers[coords.index(coord)]
+            restrictions[KeyPatch(key)] = workers[coords[coord]]
 
-        return arr.persist(workers=restrictions)
+        arr = arr.persist(workers=restrictions)
+        self.client.set_owners(
+            (arr.dask[key] for key in restrictions), restrictions.values()
+        )
+        return arr
 
     wrapper.__name__ = "cart_" + mth.__name__
     wrapper.__doc__ = array_wrapper.__doc__ % mth.__name__ + mth.__doc__
     return wrapper
 
 
+def _slab(ndim, axis, start, stop):
+    "Auxiliary function that returns the index of a slab along axis"
+    idx = [slice(None)] * ndim
+    idx[axis] = slice(start, stop)
+    return tuple(idx)
+
+
+def _halo_exchange(comm, arr, depth):
+    "Auxiliary function that pads arr with the halos received from the neighbours"
+    dims, periods, _ = comm.Get_topo()
+    for axis, width in depth.items():
+        if not width:
+            continue
+        if axis >= len(dims) or dims[axis] == 1:
+            periodic = axis < len(periods) and periods[axis]
+            pad = [(0, 0)] * arr.ndim
+            pad[axis] = (width, width)
+            arr = numpy.pad(arr, pad, mode="wrap" if periodic else "constant")
+            continue
+        # Non-periodic boundaries have PROC_NULL as neighbour and keep zeros
+        src, dest = comm.Shift(axis, 1)
+        low = numpy.zeros_like(arr[_slab(arr.ndim, axis, None, width)])
+        high = numpy.zeros_like(low)
+        send = numpy.ascontiguousarray(arr[_slab(arr.ndim, axis, -width, None)])
+        comm.Sendrecv(send, dest, recvbuf=low, source=src)
+        send = numpy.ascontiguousarray(arr[_slab(arr.ndim, axis, None, width)])
+        comm.Sendrecv(send, src, recvbuf=high, source=dest)
+        arr = numpy.concatenate([low, arr, high], axis=axis)
+    return arr
+
+
+@add_to(CartComm)
+def halo_exchange(self, arr, depth=1, axes=None):
+    """
+    Returns a new array where the chunks of arr are padded with the halos
+    of the neighbouring chunks. Halos are exchanged directly between the workers
+    via MPI and the padded chunks stay on the same workers.
+
+    Parameters
+    ----------
+    arr: Dask Array
+        A dask array distributed as the cartesian communicator.
+    depth: int or dict
+        The width of the halos. A dict can be given as {axis: depth}.
+    axes: tuple(int)
+        The axes to pad, by default the distributed ones. Boundaries follow `periods`:
+        periodic axes are wrapped and non-periodic ones are padded with zeros.
+    """
+    if isinstance(depth, dict):
+        if axes is not None:
+            raise ValueError("axes cannot be given if depth is a dict")
+    else:
+        if axes is None:
+            axes = next(zip(*self.normalize_dims()), ())
+        depth = {axis: depth for axis in axes}
+
+    for axis, width in depth.items():
+        if not 0 <= axis < arr.ndim:
+            raise ValueError(f"Axis {axis} out of range for array of ndim {arr.ndim}")
+        if not 0 <= width <= min(arr.chunks[axis]):
+            raise ValueError(f"Depth {width} not compatible with chunks on axis {axis}")
+
+    futures = Distributed(self.get_futures(arr))
+    futures = self._remote_call(_halo_exchange, self, futures, depth)
+
+    chunks = list(arr.chunks)
+    for axis, width in depth.items():
+        chunks[axis] = tuple(chunk + 2 * width for chunk in chunks[axis])
+    shape = tuple(map(sum, chunks))
+
+    return self.array(futures.dask, shape=shape, chunks=tuple(chunks), dtype=arr.dtype)
+
+
+_REDUCTIONS = {
+    "sum": (numpy.sum, "SUM"),
+    "prod": (numpy.prod, "PROD"),
+    "max": (numpy.max, "MAX"),
+    "min": (numpy.min, "MIN"),
+    "norm": (lambda arr, **kwargs: numpy.sum(abs(arr) ** 2, **kwargs), "SUM"),
+}
+
+
+def _reduce(comm, arr, op, axis, to_root):
+    "Auxiliary function that reduces arr locally and then over the processes of comm"
+    # pylint: disable=import-outside-toplevel
+    from mpi4py import MPI
+
+    local, mpi_op = _REDUCTIONS[op]
+    val = numpy.array(local(arr, axis=axis), order="C")
+    out = numpy.empty_like(val)
+    if to_root:
+        comm.Reduce(val, out, op=getattr(MPI, mpi_op), root=0)
+    else:
+        comm.Allreduce(val, out, op=getattr(MPI, mpi_op))
+    if to_root and comm.Get_rank() != 0:
+        return None
+    if op == "norm":
+        out = numpy.sqrt(out)
+    return out if axis is not None else out[()]
+
+
+@add_to(CartComm)
+def _reduce_array(self, arr, op, axis, to_root):
+    "Auxiliary function that checks the options and calls _reduce on the workers"
+    op = op or "sum"
+    if op not in _REDUCTIONS:
+        raise ValueError(f"Unknown op {op}. Available: {tuple(_REDUCTIONS)}")
+    if axis is not None:
+        axis = (axis,) if isinstance(axis, int) else tuple(axis)
+        axis = tuple(sorted(set(_i % arr.ndim if _i < 0 else _i for _i in axis)))
+        if not all(0 <= _i < arr.ndim for _i in axis):
+            raise ValueError(f"Axis {axis} out of range for array of ndim {arr.ndim}")
+
+    comm = self
+    if axis is not None:
+        comm = self._sub_futures([_i in axis for _i in range(len(self.dims))])
+    futures = Distributed(self.get_futures(arr))
+    return axis, self._remote_call(_reduce, comm, futures, op, axis, to_root)
+
+
+def _get_op(args, kwargs):
+    "Auxiliary function that returns the op given to reduce and allreduce for arrays"
+    if len(args) > 1 or (args and "op" in kwargs):
+        raise TypeError("Only op can be given as positional argument besides arr")
+    op = args[0] if args else kwargs.pop("op", None)
+    if kwargs:
+        raise TypeError(f"Unexpected arguments {tuple(kwargs)}")
+    return op
+
+
+@add_to(CartComm)
+def _sub_futures(self, remain_dims):
+    "Auxiliary function that returns the futures of sub(remain_dims) in the order of self"
+    subs = self.sub(remain_dims)
+    futures = []
+    for coord in self.coords:
+        fixed = tuple(_c for _c, _r in zip(coord, remain_dims) if not _r)
+        kept = tuple(_c for _c, _r in zip(coord, remain_dims) if _r)
+        futures.append(subs[fixed][kept])
+    return Distributed(futures)
+
+
+@add_to(CartComm)
+def reduce(self, arr, *args, axis=None, **kwargs):
+    """
+    Reduces a dask array distributed as the cartesian communicator.
+    The chunks are reduced locally and then via MPI Reduce over the communicator.
+    If arr is not a dask array, the MPI reduce of the communicator is called instead
+    with the same arguments, e.g. reduce(sendobj, op, root).
+
+    Parameters
+    ----------
+    arr: Dask Array
+        A dask array distributed as the cartesian communicator.
+    op: str, default "sum"
+        The reduction, one of sum, prod, max, min and norm.
+        Can be given as the only positional argument after arr.
+    axis: int or tuple(int)
+        The axes to reduce. The distributed ones are reduced over the sub-communicators
+        given by sub. By default the whole array is reduced and the value is returned.
+        Otherwise a dask array is returned with chunks on the roots of the sub-communicators.
+    """
+    if not isinstance(arr, Array):
+        if axis is not None:
+            raise TypeError("axis is supported only for dask arrays")
+        return self.__callattr__("reduce", arr, *args, **kwargs)
+    op = _get_op(args, kwargs)
+
+    axis, futures = self._reduce_array(arr, op, axis, to_root=True)
+    # The futures not on the roots are dropped: they must complete the collective
+    futures = futures.wait().dask
+    if axis is None:
+        return futures[self.index(0)].result()
+
+    local, _ = _REDUCTIONS[op or "sum"]
+    meta = local(numpy.ones((1,) * arr.ndim, dtype=arr.dtype))
+    if op == "norm":
+        meta = numpy.sqrt(meta)
+
+    kept = tuple(_i for _i in range(arr.ndim) if _i not in axis)
+    name = futures[0].key
+    dask = {}
+    for coord, future in zip(self.coords, futures):
+        coord = (coord + (0,) * arr.ndim)[: arr.ndim]
+        if any(coord[_i] for _i in axis):
+            continue
+        dask[(name,) + tuple(coord[_i] for _i in kept)] = future
+
+    chunks = tuple(arr.chunks[_i] for _i in kept)
+    return Array(dask, name, chunks, dtype=meta.dtype)
+
+
+@add_to(CartComm)
+def allreduce(self, arr, *args, axis=None, **kwargs):
+    """
+    Reduces a dask array distributed as the cartesian communicator.
+    The chunks are reduced locally and then via MPI Allreduce over the communicator.
+    If arr is not a dask array, the MPI allreduce of the communicator is called instead
+    with the same arguments, e.g. allreduce(sendobj, op).
+
+    Returns a Distributed object holding the result on every worker,
+    i.e. the value for axis=None or the reduced chunk of the sub-communicator.
+
+    Parameters
+    ----------
+    arr: Dask Array
+        A dask array distributed as the cartesian communicator.
+    op: str, default "sum"
+        The reduction, one of sum, prod, max, min and norm.
+        Can be given as the only positional argument after arr.
+    axis: int or tuple(int)
+        The axes to reduce. The distributed ones are reduced over the sub-communicators
+        given by sub. By default the whole array is reduced.
+    """
+    if not isinstance(arr, Array):
+        if axis is not None:
+            raise TypeError("axis is supported only for dask arrays")
+        return self.__callattr__("allreduce", arr, *args, **kwargs)
+    op = _get_op(args, kwargs)
+
+    return self._reduce_array(arr, op, axis, to_root=False)[1]
+
+
+@add_to(CartComm)
+def _get_blocks(self, arr):
+    """
+    Auxiliary function that returns arr with the chunks in memory and a dict
+    {block index: (future, index of the worker)}. If not in memory, the chunks are
+    placed as the cartesian communicator via get_futures.
+    """
+    keys = tuple(flatten(arr.__dask_keys__()))
+    futures = [arr.dask.get(key) for key in keys]
+    if not all(isinstance(future, Future) for future in futures):
+        arr = self.array(self.get_futures(arr))
+        keys = tuple(flatten(arr.__dask_keys__()))
+        futures = [arr.dask[key] for key in keys]
+
+    index = self._get_index("workers")
+    blocks = {}
+    for key, future, worker in zip(keys, futures, self.client.locate(futures)):
+        if worker not in index:
+            raise ValueError(f"Chunk {key} is not on a worker of the communicator")
+        blocks[key[1:]] = (future, index[worker])
+    if sorted(idx for _, idx in blocks.values()) != list(range(len(self))):
+        raise ValueError("The chunks must be one per worker of the communicator")
+    return arr, blocks
+
+
+def _transpose(comm, arr, from_axis, to_axis, from_chunks, to_chunks):
+    "Auxiliary function that exchanges the blocks of arr between the processes of comm"
+    blocks = numpy.split(arr, numpy.cumsum(to_chunks)[:-1], axis=to_axis)
+    shape = list(blocks[comm.Get_rank()].shape)
+    shapes = []
+    for length in from_chunks:
+        shape[from_axis] = length
+        shapes.append(tuple(shape))
+
+    sendcounts = [block.size for block in blocks]
+    sendbuf = numpy.concatenate([block.ravel() for block in blocks])
+    recvcounts = [int(numpy.prod(shape)) for shape in shapes]
+    recvbuf = numpy.empty(sum(recvcounts), dtype=arr.dtype)
+    comm.Alltoallv(
+        [sendbuf, (sendcounts, numpy.cumsum([0] + sendcounts[:-1]).tolist())],
+        [recvbuf, (recvcounts, numpy.cumsum([0] + recvcounts[:-1]).tolist())],
+    )
+    pieces = numpy.split(recvbuf, numpy.cumsum(recvcounts)[:-1])
+    return numpy.concatenate(
+        [piece.reshape(shape) for piece, shape in zip(pieces, shapes)], axis=from_axis
+    )
+
+
+@add_to(CartComm)
+def transpose(self, arr, from_axis, to_axis, chunks=None):
+    """
+    Returns a new array where from_axis, distributed along a dimension of the
+    communicator, is made local and to_axis, that must not be distributed, is split
+    instead in balanced blocks over the same processes. The data is exchanged directly
+    between the workers via MPI Alltoallv within the sub-communicators along that dimension.
+
+    Parameters
+    ----------
+    arr: Dask Array
+        A dask array distributed as the cartesian communicator or the result of transpose.
+    from_axis: int
+        The distributed axis to make local.
+    to_axis: int
+        The local axis to distribute.
+    chunks: tuple(int)
+        The chunks of to_axis, by default balanced blocks as in get_chunks.
+    """
+    if not isinstance(arr, Array):
+        raise TypeError(f"Expected a Dask Array; got {type(arr)}.")
+    for axis in from_axis, to_axis:
+        if not -arr.ndim <= axis < arr.ndim:
+            raise ValueError(f"Axis {axis} out of range for array of ndim {arr.ndim}")
+    from_axis, to_axis = from_axis % arr.ndim, to_axis % arr.ndim
+    if arr.numblocks[from_axis] == 1:
+        raise ValueError(f"Axis {from_axis} is not distributed")
+    if arr.numblocks[to_axis] != 1:
+        raise ValueError(f"Axis {to_axis} is distributed")
+
+    arr, blocks = self._get_blocks(arr)
+    procs = arr.numblocks[from_axis]
+    for dim, _l in enumerate(self.dims):
+        if _l == procs and all(
+            self.coords[idx][dim] == block[from_axis]
+            for block, (_, idx) in blocks.items()
+        ):
+            break
+    else:
+        raise ValueError(f"Axis {from_axis} is not distributed along the communicator")
+
+    size = arr.shape[to_axis]
+    if chunks is None:
+        chunks = (size // procs + (_i < size % procs) for _i in range(procs))
+    to_chunks = tuple(chunks)
+    if len(to_chunks) != procs or sum(to_chunks) != size:
+        raise ValueError(f"Chunks {to_chunks} not compatible with {procs} blocks")
+
+    futures = [None] * len(self)
+    for future, idx in blocks.values():
+        futures[idx] = future
+    comms = self._sub_futures([_i == dim for _i in range(len(self.dims))])
+    futures = self._remote_call(
+        _transpose,
+        comms,
+        Distributed(futures),
+        from_axis,
+        to_axis,
+        arr.chunks[from_axis],
+        to_chunks,
+    )
+
+    name = "transpose-" + tokenize(arr.name, from_axis, to_axis, to_chunks)
+    dask = {}
+    for block, (_, idx) in blocks.items():
+        block = list(block)
+        block[from_axis], block[to_axis] = 0, block[from_axis]
+        dask[(name,) + tuple(block)] = futures.dask[idx]
+
+    chunks = list(arr.chunks)
+    chunks[from_axis] = (arr.shape[from_axis],)
+    chunks[to_axis] = to_chunks
+    return Array(dask, name, tuple(chunks), dtype=arr.dtype)
+
+
+@add_to(CartComm)
+def _map_blocks(self, fnc, arr, dtype, **kwargs):
+    "Auxiliary function that applies fnc to the chunks of arr on the same workers"
+    arr, blocks = self._get_blocks(arr)
+    workers = self._resolved("workers")
+    name = fnc.__name__ + "-" + tokenize(arr.name, kwargs)
+    dask = {}
+    for block, (future, idx) in blocks.items():
+        future = self.client.submit(
+            fnc, future, workers=[workers[idx]], pure=False, **kwargs
+        )
+        self.client.set_owners([future], [workers[idx]])
+        dask[(name,) + block] = future
+    return Array(dask, name, arr.chunks, dtype=dtype)
+
+
+def _fft(arr, axes, norm, inverse):
+    "Auxiliary function that computes the local FFT of arr"
+    return (numpy.fft.ifftn if inverse else numpy.fft.fftn)(arr, axes=axes, norm=norm)
+
+
+@add_to(CartComm)
+def fft(self, arr, axes=None, norm=None, inverse=False):
+    """
+    Computes the n-dimensional FFT of a dask array distributed as the cartesian
+    communicator. The local axes are transformed with numpy, the distributed ones
+    are made local with transpose, transformed and then transposed back.
+    The returned array has the same chunks of arr.
+
+    Parameters
+    ----------
+    arr: Dask Array
+        A dask array distributed as the cartesian communicator.
+        At least one axis must not be distributed if any of axes is.
+    axes: tuple(int)
+        The axes to transform, by default all of them.
+    norm: str
+        The normalization, as in numpy.fft.
+    inverse: bool, default False
+        Whether to compute the inverse FFT.
+    """
+    if not isinstance(arr, Array):
+        raise TypeError(f"Expected a Dask Array; got {type(arr)}.")
+    axes = tuple(range(arr.ndim)) if axes is None else tuple(axes)
+    if not all(-arr.ndim <= axis < arr.ndim for axis in axes):
+        raise ValueError(f"Axes {axes} out of range for array of ndim {arr.ndim}")
+    axes = tuple(sorted(set(axis % arr.ndim for axis in axes)))
+    dtype = _fft(numpy.ones((1,), dtype=arr.dtype), (0,), norm, inverse).dtype
+    fft_kwargs = dict(dtype=dtype, norm=norm, inverse=inverse)
+
+    distributed = tuple(axis for axis in axes if arr.numblocks[axis] > 1)
+    local = tuple(axis for axis in axes if arr.numblocks[axis] == 1)
+    if local:
+        arr = self._map_blocks(_fft, arr, axes=local, **fft_kwargs)
+    if not distributed:
+        return arr
+
+    spare = tuple(axis for axis in range(arr.ndim) if arr.numblocks[axis] == 1)
+    if not spare:
+        raise ValueError("At least one axis must not be distributed")
+    for axis in distributed:
+        chunks = arr.chunks[axis]
+        arr = self.transpose(arr, axis, spare[0])
+        arr = self._map_blocks(_fft, arr, axes=(axis,), **fft_kwargs)
+        arr = self.transpose(arr, spare[0], axis, chunks=chunks)
+    return arr
+
+
+@add_to(CartComm)
+def ifft(self, arr, axes=None, norm=None):
+    "Computes the inverse FFT of arr; see fft for the details"
+    return self.fft(arr, axes=axes, norm=norm, inverse=True)
+
+
+def _overlaps(src_chunks, dst_chunks):
+    """
+    Auxiliary function that returns for each block of dst_chunks the list of
+    (source block, source slice, destination slice) of the overlapping blocks of src_chunks
+    """
+    src_bounds = numpy.cumsum((0,) + tuple(src_chunks))
+    dst_bounds = numpy.cumsum((0,) + tuple(dst_chunks))
+    overlaps = []
+    for start, stop in zip(dst_bounds[:-1], dst_bounds[1:]):
+        overlaps.append([])
+        for idx, (src_start, src_stop) in enumerate(
+            zip(src_bounds[:-1], src_bounds[1:])
+        ):
+            low, high = max(start, src_start), min(stop, src_stop)
+            if low < high:
+                overlaps[-1].append(
+                    (
+                        idx,
+                        slice(int(low - src_start), int(high - src_start)),
+                        slice(int(low - start), int(high - start)),
+                    )
+                )
+    return overlaps
+
+
+def _assemble(shape, dtype, idxs, *pieces):
+    "Auxiliary function that assembles a chunk of the given shape from pieces"
+    out = numpy.empty(shape, dtype=dtype)
+    for idx, piece in zip(idxs, pieces):
+        out[idx] = piece
+    return out
+
+
+@add_to(CartComm)
+def redistribute(self, arr, cart):
+    """
+    Returns arr, distributed as this cartesian communicator, distributed as cart.
+    Only the intersecting sub-blocks of the chunks are moved, directly from worker
+    to worker, and they are assembled on the workers of cart.
+
+    Parameters
+    ----------
+    arr: Dask Array
+        A dask array distributed as the cartesian communicator.
+    cart: CartComm
+        The target cartesian communicator.
+    """
+    if not isinstance(arr, Array):
+        raise TypeError(f"Expected a Dask Array; got {type(arr)}.")
+    if not isinstance(cart, CartComm):
+        raise TypeError(f"Expected a CartComm; got {type(cart)}.")
+    arr, blocks = self._get_blocks(arr)
+    chunks = cart.get_chunks(arr.shape)
+    overlaps = tuple(map(_overlaps, arr.chunks, chunks))
+    src_workers = self._resolved("workers")
+    client = self.client
+
+    # The futures of the source chunks may be reused, so the result needs its own name
+    name = "redistribute-" + tokenize(
+        arr.name, cart.dims, cart._resolved("workers"), chunks
+    )
+    idxs = tuple(idx for idx, _ in cart.normalize_dims())
+    futures = []
+    keys = []
+    for coord, worker in zip(cart.normalize_coords(), cart._resolved("workers")):
+        block = [0] * arr.ndim
+        for _i, _c in zip(idxs, coord):
+            block[_i] = _c
+        keys.append((name,) + tuple(block))
+        pieces = []
+        for parts in product(*(overlaps[_i][_b] for _i, _b in enumerate(block))):
+            src_block, src_idx, dst_idx = zip(*parts)
+            future, src = blocks[src_block]
+            shape = tuple(arr.chunks[_i][_b] for _i, _b in enumerate(src_block))
+            if any(_s.stop - _s.start != _l for _s, _l in zip(src_idx, shape)):
+                future = client.submit(
+                    getitem, future, src_idx, workers=[src_workers[src]], pure=False
+                )
+            pieces.append((future, src_workers[src], dst_idx))
+
+        if len(pieces) == 1 and pieces[0][1] == worker:
+            futures.append(pieces[0][0])
+            continue
+        shape = tuple(chunks[_i][_b] for _i, _b in enumerate(block))
+        pieces, _, dst_idxs = zip(*pieces)
+        futures.append(
+            client.submit(
+                _assemble,
+                shape,
+                arr.dtype,
+                dst_idxs,
+                *pieces,
+                workers=[worker],
+                pure=False,
+            )
+        )
+    client.set_owners(futures, cart._resolved("workers"))
+    return Array(
+        dict(zip(keys, futures)), name, chunks, dtype=arr.dtype, shape=arr.shape
+    )
+
+
 CartComm.zeros = array_wrapper(zeros)
 CartComm.ones = array_wrapper(ones)
 CartComm.empty = array_wrapper(empty)
@@ -11,6 +11,7 @@ from itertools import chain
 from dask.array import Array
 from .comm import CartComm
 from .distributed import Distributed, DistributedClass, Local
+from .instrument import stats
 
 
 class Cartesian(Distributed):
@@ -67,8 +68,9 @@ class Cartesian(Distributed):
         get_arrays = (
             lambda arr: comms.get_futures(arr) if isinstance(arr, Array) else arr
         )
-        args = (get_arrays(arg) for arg in args)
-        kwargs = {key: get_arrays(arg) for key, arg in kwargs.items()}
+        with stats.timer("arrays"):
+            args = tuple(get_arrays(arg) for arg in args)
+            kwargs = {key: get_arrays(arg) for key, arg in kwargs.items()}
 
         return Cartesian(super()._remote_call(*args, **kwargs), comms)
 
@@ -10,18 +10,29 @@ __all__ = [
 import os
 import sys
 import time
+import socket
 import shutil
-import signal
 import atexit
 import tempfile
+import threading
 import multiprocessing
-from functools import wraps
+from glob import glob
+from weakref import WeakKeyDictionary, WeakValueDictionary
+from functools import wraps, partial
+from itertools import chain
 import sh
+from lyncs_utils import compute_property
 from dask_mpi import initialize
+from dask.utils import stringify
+from dask.distributed import wait
 from dask.distributed import Client as _Client
 from dask.distributed import default_client as _default_client
+from dask.distributed import TimeoutError as _TimeoutError
+from distributed import Scheduler, Worker
+from distributed.utils import LoopRunner, sync
 from .lib import default_comm
-from .comm import Comm
+from .comm import Comm, free_on_release, free_all
+from .distributed import then, async_value, results
 
 
 @wraps(_default_client)
@@ -32,20 +43,92 @@ def default_client():
     return client
 
 
+def parse_cpulist(cpulist):
+    "Parses a list of cpus in the Linux format, e.g. 0-3,8,10-11"
+    cpus = set()
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.update(range(int(start), int(end or start) + 1))
+    return cpus
+
+
+def get_topology():
+    "Returns the host and the NUMA node (-1 if unknown) of the current process"
+    numa = -1
+    try:
+        cpus = os.sched_getaffinity(0)
+        for path in sorted(glob("/sys/devices/system/node/node[0-9]*/cpulist")):
+            with open(path) as cpulist:
+                if cpus <= parse_cpulist(cpulist.read()):
+                    numa = int(path.split("/")[-2][4:])
+                    break
+    except (AttributeError, OSError, ValueError):
+        pass
+    return socket.gethostname(), numa
+
+
 class Client(_Client):
     """
     Subclass of dask.distributed.Client specialized for MPI communicators
     The initialization follows the guidelines of http://mpi.dask.org/
     automatizing the process of creating MPI-distributed dask workers.
+
+    The communicators made by create_comm are cached: the same workers return
+    the same Comm as long as it is referenced, and then the communicators are freed.
     """
 
     def __init__(
-        self, num_workers=None, threads_per_worker=1, launch=None, out=None, err=None
+        self,
+        num_workers=None,
+        threads_per_worker=1,
+        launch=None,
+        out=None,
+        err=None,
+        timeout=30,
+        progress=False,
+        asynchronous=False,
+        keep_alive=None,
     ):
         """
         Returns a Client connected to a cluster of `num_workers` workers.
+
+        Parameters
+        ----------
+        num_workers: int, default cpu_count + 1 (launch) or comm size - 2 (not launch)
+            Number of workers of the cluster
+        threads_per_worker: int, default 1
+            Number of threads per worker
+        launch: bool, "spawn" or "local", default true if running on a single process
+            Whether to launch the MPI server in the background with mpirun.
+            If "spawn", the server is spawned by this process via MPI Spawn; this
+            avoids starting mpirun and the MPI runtime is reused by the next Clients.
+            If "local", the scheduler and one worker run in this process on COMM_WORLD
+            of size one, without mpirun; this starts in a fraction of a second.
+        out, err: file-like, default sys.stdout, sys.stderr
+            Where to redirect the output of the MPI server (not used if spawned)
+        timeout: float, default 30
+            Time in seconds to wait for the workers to connect,
+            after which a RuntimeError is raised
+        progress: bool, default false
+            Reports the number of connected workers while waiting
+        asynchronous: bool, default false
+            Whether the client is used in an event loop, e.g. `async with Client(...)`.
+            Then the client needs to be awaited and the remote calls return awaitables.
+        keep_alive: float, default None
+            If given, close_server keeps the launched server alive for keep_alive seconds,
+            and the next Clients with the same launch, num_workers and threads_per_worker
+            attach to it instead of launching a new one. The idle servers are closed
+            after the timeout or at exit.
         """
         self._server = None
+        self._comm = None
+        self._owners = WeakKeyDictionary()
+        self._array_meta = WeakKeyDictionary()
+        self._comms = WeakValueDictionary()
+        self._setup_args = (num_workers, timeout, progress)
+        self._keep_alive = keep_alive
 
         if launch is None:
             launch = default_comm().size == 1
@@ -69,14 +152,82 @@ class Client(_Client):
                 nanny=False,
             )
 
-            super().__init__()
+            super().__init__(asynchronous=asynchronous)
 
         else:
-            num_workers = num_workers or (multiprocessing.cpu_count() + 1)
+            if launch == "local":
+                num_workers = num_workers or 1
+                if num_workers != 1 or default_comm().size != 1:
+                    raise ValueError(
+                        "A local client requires a single process and supports one worker"
+                    )
+            else:
+                num_workers = num_workers or (multiprocessing.cpu_count() + 1)
+
+            self._key = (launch, num_workers, threads_per_worker)
+            idle = IdleServer.pop(self._key) if keep_alive is not None else None
+            if idle is not None:
+                self._server, self._dir, self._connect = idle
+            else:
+                self._launch(launch, num_workers, threads_per_worker, out, err)
 
-            # Since dask-mpi produces several file we create a temporary directory
-            self._dir = tempfile.mkdtemp()
+            atexit.register(self.close_server)
+
+            super().__init__(**self._connect, asynchronous=asynchronous)
+
+        if asynchronous:
+            # The setup is completed by _start when the client is awaited
+            return
+
+        try:
+            self.wait_for_workers(num_workers, timeout=timeout, progress=progress)
+        except _TimeoutError as error:
+            if self.server is not None:
+                self.close_server()
+            raise RuntimeError(
+                "Couldn't connect to %d processes in %ss. Got %d workers."
+                % (num_workers, timeout, len(self.workers))
+            ) from error
 
+        self.ranks = {key: val["name"] for key, val in self.workers.items()}
+        self._comm = self.create_comm()
+
+    async def _start(self, *args, **kwargs):
+        await super()._start(*args, **kwargs)
+        if not self.asynchronous:
+            return self
+
+        num_workers, timeout, progress = self._setup_args
+        try:
+            await self._wait_for_workers(
+                num_workers, timeout=timeout, progress=progress
+            )
+        except _TimeoutError as err:
+            if self.server is not None:
+                await self.close_server()
+            raise RuntimeError(
+                "Couldn't connect to %d processes in %ss." % (num_workers, timeout)
+            ) from err
+
+        await self._update_scheduler_info()
+        self.ranks = {key: val["name"] for key, val in self.workers.items()}
+        self._topology = await self.run(get_topology)
+        self._comm = await self.create_comm()
+        return self
+
+    def _launch(self, launch, num_workers, threads_per_worker, out, err):
+        "Launches the server; used by __init__"
+        # Since dask-mpi produces several file we create a temporary directory
+        self._dir = tempfile.mkdtemp()
+
+        if launch == "local":
+            self._server = LocalServer(self._dir, threads_per_worker)
+            self._connect = {"address": self._server.address}
+            return
+
+        if launch == "spawn":
+            self._server = SpawnServer(self._dir, num_workers, threads_per_worker)
+        else:
             # The command runs in the background (_bg=True)
             # and the stdout(err) is stored in self._out(err)
             pwd = os.getcwd()
@@ -95,30 +246,7 @@ class Client(_Client):
                 _err=err or sys.stderr,
             )
             sh.cd(pwd)
-
-            atexit.register(self.close_server)
-
-            super().__init__(scheduler_file=self._dir + "/scheduler.json")
-
-        # Waiting for all the workers to connect
-        def handler(signum, frame):
-            if self.server is not None:
-                self.close_server()
-            raise RuntimeError(
-                "Couldn't connect to %d processes. Got %d workers."
-                % (num_workers, len(self.workers))
-            )
-
-        signal.signal(signal.SIGALRM, handler)
-        signal.alarm(5)
-
-        while len(self.workers) != num_workers:
-            time.sleep(0.001)
-
-        signal.alarm(0)
-
-        self.ranks = {key: val["name"] for key, val in self.workers.items()}
-        self._comm = self.create_comm()
+        self._connect = {"scheduler_file": self._dir + "/scheduler.json"}
 
     @property
     def comm(self):
@@ -130,6 +258,11 @@ class Client(_Client):
         "Returns the list of workers."
         return self.scheduler_info()["workers"]
 
+    @compute_property
+    def topology(self):
+        "Returns the host and NUMA node of the workers as a dict worker: (host, numa)"
+        return self.run(get_topology)
+
     @property
     def server(self):
         "Returns the running server if available"
@@ -141,13 +274,52 @@ class Client(_Client):
         """
         if self.server is None:
             raise RuntimeError("No MPI-server started by the client")
-        self.shutdown()
+        if self.asynchronous:
+            return self._async_close_server()
+        if self._terminate:
+            self.shutdown()
+        elif self._keep_alive is not None:
+            # The server is reused: the communicators must not leak
+            free_all(self, self._comms.values())
         self.close()
-        self.server.wait()
-        shutil.rmtree(self._dir)
+        self._remove_server()
+        return None
+
+    async def _async_close_server(self):
+        "Asynchronous variant of close_server"
+        if self._terminate:
+            await self.shutdown()
+        elif self._keep_alive is not None:
+            await free_all(self, self._comms.values())
+        await self.close()
+        self._remove_server()
+
+    @property
+    def _terminate(self):
+        "Whether close_server shuts down the scheduler and the workers"
+        # The local server is closed directly by its wait
+        return self._keep_alive is None and not isinstance(self.server, LocalServer)
+
+    def _remove_server(self):
+        """
+        Waits for the server to terminate and removes its directory.
+        With keep_alive the server is instead stored as idle.
+        """
+        if self._keep_alive is None:
+            _remove_server(self.server, self._dir)
+        else:
+            IdleServer(
+                self._key, self.server, self._dir, self._connect, self._keep_alive
+            )
         self._server = None
         atexit.unregister(self.close_server)
 
+    async def __aexit__(self, *args):
+        if self.server is not None:
+            await self.close_server()
+        else:
+            await super().__aexit__(*args)
+
     def __del__(self):
         """
         In case of server started, closes the server
@@ -158,25 +330,137 @@ class Client(_Client):
         if hasattr(self, "_timeout"):
             super().__del__()
 
-    def who_has(self, *args, overload=True, **kwargs):
+    def wait_for_workers(self, n_workers=0, timeout=None, progress=False):
+        """
+        Overloading of distributed.Client wait_for_workers.
+        Waits for `n_workers` to connect using the scheduler events.
+
+        Parameters
+        ----------
+        timeout: float, default none
+            Time in seconds after which a TimeoutError is raised
+        progress: bool, default false
+            Reports on stderr the number of connected workers while waiting
+        """
+        return self.sync(
+            self._wait_for_workers, n_workers, timeout=timeout, progress=progress
+        )
+
+    async def _wait_for_workers(self, n_workers=0, timeout=None, progress=False):
+        "Asynchronous variant of wait_for_workers"
+        if not progress:
+            return await super()._wait_for_workers(n_workers, timeout=timeout)
+        start = time.time()
+        connected = 0
+        while connected < n_workers:
+            left = None
+            if timeout is not None:
+                left = start + timeout - time.time()
+                if left <= 0:
+                    raise _TimeoutError(
+                        "Only %d/%d workers arrived after %ss"
+                        % (connected, n_workers, timeout)
+                    )
+            await super()._wait_for_workers(connected + 1, timeout=left)
+            connected = len((await self.scheduler.identity())["workers"])
+            print(
+                f"Connected {connected}/{n_workers} workers "
+                f"in {time.time() - start:.2f}s",
+                file=sys.stderr,
+            )
+        return None
+
+    def who_has(self, futures=None, overload=True, **kwargs):
         """
         Overloading of distributed.Client who_has.
-        Checks that only one worker owns the futures and returns the list of workers.
+        Checks that only one worker owns the futures and returns the list of workers
+        in the same order of the futures.
 
         Parameters
         ----------
         overload: bool, default true
             If false the original who_has is used
         """
-        if overload:
-            _workers = list(super().who_has(*args, **kwargs).values())
-            workers = [w[0] for w in _workers if len(w) == 1]
-            assert len(workers) == len(
-                _workers
-            ), "More than one process has the same reference"
-            return workers
+        who_has = super().who_has(futures, **kwargs)
+        if not overload:
+            return who_has
+        keys = None
+        if futures is not None:
+            keys = [ftr.key for ftr in self.futures_of(futures)]
+        return then(who_has, partial(_single_owners, keys=keys))
+
+    def set_owners(self, futures, workers):
+        """
+        Stores the worker owning each of the futures, such that locate does not
+        query the scheduler. The futures must be pinned to the workers by their
+        placement restrictions, otherwise the scheduler may move them.
+        """
+        for ftr, worker in zip(futures, workers):
+            self._owners[ftr] = worker
 
-        return super().who_has(*args, **kwargs)
+    def locate(self, futures):
+        """
+        Returns the list of workers owning the futures.
+        Owners stored with set_owners are used directly, the others
+        are fetched with a single call to who_has.
+        If the client is asynchronous an awaitable is returned.
+        """
+        futures = list(futures)
+        missing = [ftr for ftr in futures if ftr not in self._owners]
+        if self.asynchronous:
+            return self._async_locate(futures, missing)
+        owners = {}
+        if missing:
+            wait(missing)
+            for ftr in missing:
+                if ftr.status == "error":
+                    raise ftr.exception()
+            who_has = super().who_has(missing)
+            owners = dict(
+                zip(missing, _single_owners(who_has, [f.key for f in missing]))
+            )
+        return [owners[ftr] if ftr in owners else self._owners[ftr] for ftr in futures]
+
+    async def _async_locate(self, futures, missing):
+        "Asynchronous variant of locate"
+        owners = {}
+        if missing:
+            await wait(missing)
+            for ftr in missing:
+                if ftr.status == "error":
+                    raise await ftr.exception()
+            who_has = await super().who_has(missing)
+            owners = dict(
+                zip(missing, _single_owners(who_has, [f.key for f in missing]))
+            )
+        return [owners[ftr] if ftr in owners else self._owners[ftr] for ftr in futures]
+
+    def set_array_meta(self, futures, metas):
+        """
+        Stores the (dtype, shape) of the arrays held by the futures,
+        e.g. as known when placing the chunks, such that array_meta does not fetch them.
+        """
+        for ftr, meta in zip(futures, metas):
+            self._array_meta[ftr] = meta
+
+    def array_meta(self, futures):
+        """
+        Returns the list of (dtype, shape) of the arrays held by the futures.
+        Values stored with set_array_meta or found by previous calls are used directly,
+        the others are fetched with a single gather and stored.
+        If the client is asynchronous an awaitable is returned.
+        """
+        futures = list(futures)
+        missing = [ftr for ftr in futures if ftr not in self._array_meta]
+        if not missing:
+            metas = [self._array_meta[ftr] for ftr in futures]
+            return async_value(metas) if self.asynchronous else metas
+
+        def store(metas):
+            self.set_array_meta(missing, metas)
+            return [self._array_meta[ftr] for ftr in futures]
+
+        return then(results(*self.map(_get_array_meta, missing)), store)
 
     def select_workers(
         self, num_workers=None, workers=None, exclude=None, resources=None
@@ -184,14 +468,20 @@ class Client(_Client):
         """
         Selects `num_workers` from the one available.
 
+        Workers are chosen filling first the hosts and NUMA nodes with more available
+        workers and preferring the less busy ones. The selected workers are returned
+        grouped by host and NUMA node and ordered by rank, such that consecutive
+        ranks, i.e. neighbouring Cartesian coordinates, share the same node.
+
         Parameters
         ----------
         workers: list, default all
           List of workers to choose from.
         exclude: list, default none
             List of workers to exclude from the total.
-        resources: dict, default none
-            Defines the resources the workers should have.
+        resources: str or dict, default none
+            Defines the resources the workers should have, e.g. {"GPU": 1}.
+            A string is equivalent to {resources: 1}.
         """
 
         if not workers:
@@ -205,9 +495,18 @@ class Client(_Client):
                 exclude = [exclude]
             workers = workers.difference(exclude)
 
+        infos = self.workers
         if resources:
-            # TODO select accordingly requested resources
-            raise NotImplementedError("Resources not implemented.")
+            if isinstance(resources, str):
+                resources = {resources: 1}
+            workers = set(
+                worker
+                for worker in workers
+                if all(
+                    infos[worker].get("resources", {}).get(key, 0) >= val
+                    for key, val in resources.items()
+                )
+            )
 
         if not num_workers:
             num_workers = len(workers)
@@ -215,11 +514,37 @@ class Client(_Client):
         if num_workers > len(workers):
             raise RuntimeError("Available workers are less than required")
 
-        # TODO implement some rules to choose wisely n workers
-        # e.g. workers less busy, close to each other, etc
-        selected = list(workers)[:num_workers]
+        # Grouping the workers per host and NUMA node
+        groups = {}
+        for worker in workers:
+            host, numa = self.topology[worker]
+            groups.setdefault(host, {}).setdefault(numa, []).append(worker)
+
+        def load(worker):
+            metrics = infos[worker].get("metrics", {})
+            # depending on the version these are either counts or dicts of tasks
+            counts = (metrics.get(key, 0) for key in ("executing", "ready"))
+            return sum(
+                sum(count.values()) if isinstance(count, dict) else count
+                for count in counts
+            )
+
+        order = {}
+        hosts = sorted(
+            groups, key=lambda host: (-sum(map(len, groups[host].values())), host)
+        )
+        for i, host in enumerate(hosts):
+            numas = sorted(
+                groups[host], key=lambda numa: (-len(groups[host][numa]), numa)
+            )
+            for j, numa in enumerate(numas):
+                for worker in groups[host][numa]:
+                    order[worker] = (i, j, load(worker), self.ranks[worker])
 
-        return selected
+        selected = sorted(workers, key=order.__getitem__)[:num_workers]
+        return sorted(
+            selected, key=lambda worker: order[worker][:2] + order[worker][3:]
+        )
 
     @wraps(select_workers)
     def create_comm(self, *args, **kwargs):
@@ -233,24 +558,220 @@ class Client(_Client):
         """
 
         workers = self.select_workers(*args, **kwargs)
+        comm = self._comms.get(tuple(workers))
+        if comm is not None:
+            return async_value(comm) if self.asynchronous else comm
+
         ranks = [[self.ranks[w] for w in workers]] * len(workers)
         ranks = self.scatter(ranks, workers=workers, hash=False, broadcast=False)
+        if self.asynchronous:
+            return self._async_create_comm(workers, ranks)
+
+        owners = self.who_has(ranks)
+        _check_scatter(workers, owners)
+        return self._make_comm(workers, ranks, owners)
+
+    async def _async_create_comm(self, workers, ranks):
+        "Asynchronous variant of create_comm"
+        ranks = await ranks
+        owners = await self.who_has(ranks)
+        _check_scatter(workers, owners)
+        comm = self._make_comm(workers, ranks, owners)
+        # The synchronous accessors, e.g. index, use the ranks and the workers
+        await comm.ranks
+        await comm.workers
+        return comm
+
+    def _make_comm(self, workers, ranks, owners):
+        "Creates the communicators pinned to the owners of ranks; used by create_comm"
+        comms = [
+            self.submit(_create_comm, rank, workers=[owner], pure=False)
+            for rank, owner in zip(ranks, owners)
+        ]
+        self.set_owners(comms, owners)
+        comm = Comm(comms)
+        if self._comm is not None:
+            # The global communicator lives as long as the client
+            free_on_release(comm)
+        self._comms[tuple(workers)] = comm
+        return comm
+
+
+class IdleServer:
+    """
+    Server kept alive after its client has been closed; used by Client(keep_alive=...).
+    The server is closed after `timeout` seconds unless a new Client attaches to it.
+    """
+
+    servers = {}
+    lock = threading.Lock()
+
+    def __init__(self, key, server, directory, connect, timeout):
+        self.key = key
+        self.server = server
+        self.directory = directory
+        self.connect = connect
+        self.timer = threading.Timer(timeout, self.close)
+        self.timer.daemon = True
+        with self.lock:
+            self.servers.setdefault(key, []).append(self)
+        self.timer.start()
+
+    @classmethod
+    def pop(cls, key):
+        "Returns (server, directory, connect) of an idle server for key, if any"
+        with cls.lock:
+            idle = cls.servers.get(key)
+            if not idle:
+                return None
+            server = idle.pop()
+            if not idle:
+                del cls.servers[key]
+        server.timer.cancel()
+        return server.server, server.directory, server.connect
+
+    def close(self):
+        "Shuts down the server if still idle"
+        with self.lock:
+            idle = self.servers.get(self.key, [])
+            if self not in idle:
+                return
+            idle.remove(self)
+            if not idle:
+                del self.servers[self.key]
+        self.timer.cancel()
+        if not isinstance(self.server, LocalServer):
+            with _Client(**self.connect, set_as_default=False) as client:
+                client.shutdown()
+        _remove_server(self.server, self.directory)
+
+    @classmethod
+    def close_all(cls):
+        "Shuts down all the idle servers"
+        with cls.lock:
+            idles = list(chain(*cls.servers.values()))
+        for idle in idles:
+            idle.close()
+
+
+atexit.register(IdleServer.close_all)
+
+
+def _remove_server(server, directory):
+    "Waits for the server to terminate and removes its directory"
+    server.wait()
+    shutil.rmtree(directory)
+
+
+class SpawnServer:
+    """
+    MPI server spawned by the current process via MPI Spawn.
+    Used by Client(launch="spawn") in place of mpirun.
+    """
+
+    def __init__(self, directory, num_workers, nthreads=1):
+        # pylint: disable=import-outside-toplevel
+        from mpi4py import MPI
 
-        # Checking the distribution of the group
-        _workers = self.who_has(ranks)
-        assert set(workers) == set(
-            _workers
-        ), """
-        Error: Something wrong with scatter. Not all the workers got a piece.
-        Expected workers = %s
-        Got workers = %s
-        """ % (
-            workers,
-            _workers,
+        self._intercomm = MPI.COMM_SELF.Spawn(
+            sys.executable,
+            args=[
+                "-m",
+                "lyncs_mpi.spawn",
+                "--no-nanny",
+                "--nthreads",
+                str(nthreads),
+                "--scheduler-file",
+                os.path.join(directory, "scheduler.json"),
+                "--local-directory",
+                directory,
+            ],
+            maxprocs=num_workers + 1,
+        )
+
+    def wait(self):
+        "Waits for the server to terminate, i.e. to disconnect"
+        if self._intercomm is None:
+            return
+        self._intercomm.Disconnect()
+        self._intercomm = None
+
+
+class LocalServer:
+    """
+    Scheduler and worker running in the current process on a background event loop.
+    Used by Client(launch="local") in place of the MPI server.
+    """
+
+    def __init__(self, directory, nthreads=1):
+        self._runner = LoopRunner(asynchronous=False)
+        self._runner.start()
+        self.scheduler, self.worker = sync(
+            self._runner.loop, self._start, directory, nthreads
         )
 
-        def _create_comm(ranks):
-            comm = default_comm()
-            return comm.Create_group(comm.group.Incl(ranks))
+    @staticmethod
+    async def _start(directory, nthreads):
+        "Starts the scheduler and the worker with rank 0"
+        scheduler = await Scheduler(protocol="inproc", dashboard_address=None)
+        worker = await Worker(
+            scheduler.address, nthreads=nthreads, name=0, local_directory=directory
+        )
+        return scheduler, worker
 
-        return Comm(self.map(_create_comm, ranks))
+    @property
+    def address(self):
+        "Address of the scheduler"
+        return self.scheduler.address
+
+    def wait(self):
+        "Closes the worker and the scheduler and stops the event loop"
+        if self._runner is None:
+            return
+        sync(self._runner.loop, self._close)
+        self._runner.stop()
+        self._runner = None
+
+    async def _close(self):
+        "Closes the worker and the scheduler"
+        await self.worker.close()
+        await self.scheduler.close()
+
+
+def _get_array_meta(arr):
+    "Returns the dtype and shape of arr; used by Client.array_meta"
+    return arr.dtype, arr.shape
+
+
+def _single_owners(who_has, keys=None):
+    "Returns the worker owning each of the keys (default all); used by Client.who_has"
+    if keys is None:
+        keys = who_has.keys()
+    workers = []
+    for key in keys:
+        owners = who_has.get(key, who_has.get(stringify(key), ()))
+        if not owners:
+            raise RuntimeError(f"No worker holds the result of {key}")
+        assert len(owners) == 1, "More than one process has the same reference"
+        workers.append(owners[0])
+    return workers
+
+
+def _check_scatter(workers, _workers):
+    "Checks the distribution of the group; used by Client.create_comm"
+    assert set(workers) == set(
+        _workers
+    ), """
+    Error: Something wrong with scatter. Not all the workers got a piece.
+    Expected workers = %s
+    Got workers = %s
+    """ % (
+        workers,
+        _workers,
+    )
+
+
+def _create_comm(ranks):
+    "Creates the communicator of the group of ranks; used by Client.create_comm"
+    comm = default_comm()
+    return comm.Create_group(comm.group.Incl(ranks))
@@ -5,8 +5,11 @@ __all__ = [
     "CartComm",
 ]
 
-from lyncs_utils import compute_property
-from .distributed import Distributed, results
+from threading import Lock
+from weakref import WeakValueDictionary, finalize
+from distributed import Future, fire_and_forget
+from lyncs_utils import isiterable
+from .distributed import Distributed, results, remote_property, async_value
 
 
 class Comm(Distributed):
@@ -14,10 +17,12 @@ class Comm(Distributed):
 
     __slots__ = [
         "_ranks",
+        "_carts",
     ]
 
     def __init__(self, comms):
         super().__init__(comms, cls=self.type)
+        self._carts = WeakValueDictionary()
 
     @property
     def type(self):
@@ -32,7 +37,7 @@ class Comm(Distributed):
         "Size of the communicator"
         return len(self)
 
-    @compute_property
+    @remote_property
     def ranks(self):
         "Ranks of the communicator with respective worker"
         return results(*self.rank)
@@ -40,7 +45,7 @@ class Comm(Distributed):
     @property
     def ranks_workers(self):
         "Mapping between ranks and workers"
-        return dict(zip(self.ranks, self.workers))
+        return dict(zip(self._resolved("ranks"), self._resolved("workers")))
 
     def create_cart(self, dims, periods=True, reorder=False):
         """
@@ -54,15 +59,39 @@ class Comm(Distributed):
             logical [array] specifying whether the grid is periodic (True) or not (False)
         reorder: boolean
             ranking may be reordered (True) or not (False)
+
+        The communicators are cached: the same parameters return the same CartComm
+        as long as it is referenced, and then the communicators are freed.
+        If the client is asynchronous an awaitable is returned.
         """
-        return CartComm(self.Create_cart(dims, periods=periods, reorder=reorder))
+        dims = tuple(dims)
+        if isiterable(periods):
+            periods = tuple(map(bool, periods))
+        else:
+            periods = (bool(periods),) * len(dims)
+        key = (dims, periods, bool(reorder))
+
+        cart = self._carts.get(key)
+        if cart is not None:
+            return async_value(cart) if self.client.asynchronous else cart
+
+        cart = CartComm(self.Create_cart(dims, periods=periods, reorder=reorder))
+        if self.client.asynchronous:
+            return self._async_create_cart(key, cart)
+        self._carts[key] = free_on_release(cart)
+        return cart
+
+    async def _async_create_cart(self, key, cart):
+        "Asynchronous variant of create_cart"
+        free_on_release(await cart.init_topo())
+        return self._carts.setdefault(key, cart)
 
     def index(self, key):
         "Returns the index of key that can be either rank(int) or worker(str)"
-        if isinstance(key, int) and key in self.ranks:
-            return self.ranks.index(key)
-        if isinstance(key, str) and key in self.workers:
-            return self.workers.index(key)
+        if isinstance(key, int) and key in self._get_index("ranks"):
+            return self._get_index("ranks")[key]
+        if isinstance(key, str) and key in self._get_index("workers"):
+            return self._get_index("workers")[key]
         raise KeyError(f"{key} is neither a rank or a worker of {self}")
 
 
@@ -73,11 +102,42 @@ class CartComm(Comm):
         "_dims",
         "_periods",
         "_coords",
+        "_normalized_dims",
+        "_normalized_coords",
+        "_subs",
     ]
 
     def __init__(self, comms):
         super().__init__(comms)
-        topos = results(*self.Get_topo())
+        self._subs = {}
+        if not self.client.asynchronous:
+            self._set_topo(results(*self.Get_topo()), self.ranks)
+
+    def init_topo(self):
+        """
+        Fetches the topology of the communicator.
+        Needed only with asynchronous clients, where it returns an awaitable.
+        """
+        if not self.client.asynchronous:
+            return self
+        return self._async_init_topo()
+
+    async def _async_init_topo(self):
+        "Asynchronous variant of init_topo"
+        self._set_topo(await results(*self.Get_topo()), await self.ranks)
+        # The synchronous accessors, e.g. index, use the workers
+        await self.workers
+        return self
+
+    def _set_topo(self, topos, ranks):
+        "Stores the topology of the communicator; used by __init__"
+        # With reorder=True MPI may renumber the processes: sorting the futures
+        # by rank keeps ranks, workers and coords consistently indexed.
+        order = sorted(range(len(ranks)), key=ranks.__getitem__)
+        if order != list(range(len(ranks))):
+            self._dask = tuple(self._dask[idx] for idx in order)
+            self._ranks = tuple(ranks[idx] for idx in order)
+            topos = tuple(topos[idx] for idx in order)
         self._dims = tuple(topos[0][0])
         self._periods = tuple(bool(_) for _ in topos[0][1])
         self._coords = tuple(tuple(topo[2]) for topo in topos)
@@ -108,7 +168,7 @@ class CartComm(Comm):
     @property
     def ranks_coords(self):
         "Coordinates of the ranks of the cartesian communicator"
-        return dict(zip(self.ranks, self.coords))
+        return dict(zip(self._resolved("ranks"), self.coords))
 
     def index(self, key):
         "Returns the index of key that can be either rank(int) or worker(str) or coord(tuple)"
@@ -121,16 +181,163 @@ class CartComm(Comm):
                 key = key[:ldims]
             else:
                 raise KeyError(f"{key} out of range {self.dims}")
-            return self.coords.index(key)
+            if key not in self._get_index("coords"):
+                raise KeyError(f"{key} is not a coordinate of {self}")
+            return self._get_index("coords")[key]
         return super().index(key)
 
     def normalize_dims(self):
         "Removes non-distributed dimensions from dims. Returns tuple (index, size)"
-        return tuple((_i, _l) for _i, _l in enumerate(self.dims) if _l > 1)
+        try:
+            return self._normalized_dims
+        except AttributeError:
+            self._normalized_dims = tuple(
+                (_i, _l) for _i, _l in enumerate(self.dims) if _l > 1
+            )
+            return self._normalized_dims
 
     def normalize_coords(self):
         "Removes non-distributed dimensions from coords."
-        dims = self.normalize_dims()
-        return tuple(tuple(coord[_i] for _i, _ in dims) for coord in self.coords)
+        try:
+            return self._normalized_coords
+        except AttributeError:
+            dims = self.normalize_dims()
+            self._normalized_coords = tuple(
+                tuple(coord[_i] for _i, _ in dims) for coord in self.coords
+            )
+            return self._normalized_coords
+
+    def sub(self, remain_dims):
+        """
+        Partitions the communicator in cartesian sub-communicators of lower dimension.
+        Returns a dict {coords: CartComm} where coords are the coordinates
+        along the dimensions that are not kept.
+
+        Parameters
+        ----------
+        remain_dims: list(bool)
+            whether the i-th dimension is kept in the sub-communicators (True) or not (False)
+        """
+        remain_dims = tuple(map(bool, remain_dims))
+        if len(remain_dims) != len(self.dims):
+            raise ValueError(f"Expected {len(self.dims)} values; got {remain_dims}")
+
+        if remain_dims in self._subs:
+            return self._subs[remain_dims]
+
+        comms = self.Sub(remain_dims)
+        groups = {}
+        for comm, coord in zip(comms, self.coords):
+            key = tuple(_c for _c, _r in zip(coord, remain_dims) if not _r)
+            groups.setdefault(key, []).append(comm)
+        self._subs[remain_dims] = {
+            key: free_on_release(CartComm(comms)) for key, comms in groups.items()
+        }
+        return self._subs[remain_dims]
+
+    def __getitem__(self, key):
+        """
+        Returns the future of a rank, worker or coord, or a sub-communicator
+        if key contains slices, e.g. cart[:, 0]. Only full slices are supported.
+        """
+        if isinstance(key, slice):
+            key = (key,)
+        if not isinstance(key, tuple) or not any(isinstance(_k, slice) for _k in key):
+            return super().__getitem__(key)
+
+        if len(key) > len(self.dims):
+            raise KeyError(f"{key} out of range {self.dims}")
+        key += (slice(None),) * (len(self.dims) - len(key))
+        remain_dims = []
+        coords = []
+        for _k, dim in zip(key, self.dims):
+            if isinstance(_k, slice):
+                if _k != slice(None):
+                    raise KeyError(f"Only full slices are supported; got {_k}")
+                remain_dims.append(True)
+            elif -dim <= _k < dim:
+                remain_dims.append(False)
+                coords.append(_k % dim)
+            else:
+                raise KeyError(f"{key} out of range {self.dims}")
+        return self.sub(remain_dims)[tuple(coords)]
 
     # NOTE: additional methods are implemented in cart_array.py
+
+
+def free_on_release(comm):
+    """
+    Frees the MPI communicators of comm when it is garbage collected.
+    The Free is submitted once the tasks pending at that time are completed,
+    such that the calls already submitted on the communicators can finish.
+    Note: the communicators must not be used anymore on the workers after that.
+    """
+    fin = finalize(comm, _free_comms, comm.client, comm.dask)
+    fin.atexit = False
+    return comm
+
+
+def _free_comms(client, comms):
+    "Frees the communicators after the pending tasks; used by free_on_release"
+    if client.status != "running":
+        return
+    keys = set(ftr.key for ftr in comms)
+    pending = [
+        Future(key, client, inform=False)
+        for key, state in list(client.futures.items())
+        if state.status == "pending" and key not in keys
+    ]
+    if not pending:
+        _submit_free(client, comms)
+        return
+
+    lock = Lock()
+    count = [len(pending)]
+
+    def done(_):
+        with lock:
+            count[0] -= 1
+            if count[0]:
+                return
+        pending.clear()
+        _submit_free(client, comms)
+
+    for ftr in pending:
+        ftr.add_done_callback(done)
+
+
+def free_all(client, comms):
+    """
+    Frees the MPI communicators of comms and of their Cartesian and sub-communicators,
+    e.g. before parking a server that will be reused. Waits for the Free to complete;
+    if the client is asynchronous an awaitable is returned.
+    """
+    futures = {ftr.key: ftr for comm in _with_children(comms) for ftr in comm.dask}
+    return client.gather(client.map(_free_comm, list(futures.values()), pure=False))
+
+
+def _with_children(comms):
+    "Yields the communicators and their Cartesian and sub-communicators"
+    # pylint: disable=protected-access
+    for comm in list(comms):
+        yield comm
+        yield from _with_children(comm._carts.values())
+        if isinstance(comm, CartComm):
+            for subs in comm._subs.values():
+                yield from _with_children(subs.values())
+
+
+def _submit_free(client, comms):
+    "Submits the Free of the communicators; used by free_on_release"
+    if client.status == "running":
+        fire_and_forget(client.map(_free_comm, comms, pure=False))
+
+
+def _free_comm(comm):
+    "Frees the communicator; used by free_on_release"
+    comm.Free()
+
+
+# The methods for distributed arrays of CartComm are added by cart_array
+# pylint: disable=wrong-import-position,cyclic-import,unused-import
+from . import cart_array
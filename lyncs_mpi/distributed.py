@@ -7,14 +7,17 @@ __all__ = [
     "Local",
     "DistributedClass",
     "results",
+    "DistributedError",
 ]
 
 import uuid
+from copy import copy
+from operator import itemgetter
 from itertools import chain
-from functools import wraps
-from inspect import isclass
+from functools import wraps, partial, lru_cache
+from inspect import isclass, isawaitable
 from distributed.client import Future
-from distributed import as_completed
+from distributed import as_completed, wait
 from lyncs_utils import (
     isiterable,
     interactive,
@@ -22,6 +25,7 @@ from lyncs_utils import (
     apply_annotations,
     select_kwargs,
 )
+from .instrument import stats, timed, nbytes
 
 
 def isdistributed(val):
@@ -34,9 +38,141 @@ def anydistributed(*args, **kwargs):
     return any((isdistributed(val) for val in chain(args, kwargs.values())))
 
 
+def then(value, fnc):
+    "Applies fnc to value. If value is awaitable, returns an awaitable of the result"
+    if not isawaitable(value):
+        return fnc(value)
+
+    async def _then():
+        return fnc(await value)
+
+    return _then()
+
+
+class remote_property(compute_property):
+    """
+    Like compute_property, but if the client is asynchronous an awaitable is returned.
+    The value is computed once, awaited if needed, and then stored in key.
+    """
+
+    def __get__(self, obj, owner):
+        if obj is None or not obj.client.asynchronous:
+            return super().__get__(obj, owner)
+        return self._async_get(obj, owner)
+
+    async def _async_get(self, obj, owner):
+        "Asynchronous variant of __get__"
+        try:
+            return copy(getattr(obj, self.key))
+        except AttributeError:
+            value = self.fget(obj)
+            if isawaitable(value):
+                value = await value
+            setattr(obj, self.key, value)
+            return copy(value)
+
+
+@lru_cache(maxsize=None)
+def _type_attrs(cls):
+    "Returns the attributes of cls; cached version of dir(cls)"
+    return frozenset(dir(cls))
+
+
+@lru_cache(maxsize=None)
+def _get_dispatch(cls, key):
+    """
+    Resolves once per type how to call the attribute key of cls.
+    Returns (attr, finalize, is_callable, is_pure, is_annotated) or None if missing.
+    """
+    try:
+        attr = getattr(cls, key)
+    except AttributeError:
+        return None
+    annotations = getattr(attr, "__annotations__", {})
+    return (
+        attr,
+        Distributed._get_finalize(attr),
+        callable(attr),
+        Distributed._is_pure(attr),
+        any(callable(val) for name, val in annotations.items() if name != "return"),
+    )
+
+
+class DistributedError(RuntimeError):
+    "Error raised when the remote calls failed on more than one worker"
+
+    def __init__(self, errors, total):
+        self.errors = errors
+        lines = (
+            f"  [{idx}] {type(err).__name__}: {err}" for idx, err in errors.items()
+        )
+        super().__init__(
+            f"Remote calls failed on {len(errors)} of {total} futures:\n"
+            + "\n".join(lines)
+        )
+
+
+def _insert_results(args, idxs, vals):
+    "Auxiliary function that replaces the futures in args with vals used by results"
+    args = list(args)
+    for idx, val in zip(idxs, vals):
+        args[idx] = val
+    return tuple(args)
+
+
+def _raise_errors(errors, total):
+    "Auxiliary function that raises the errors collected by results"
+    if len(errors) > 1:
+        raise DistributedError(errors, total) from next(iter(errors.values()))
+
+
+async def _async_results(args, idxs, ftrs):
+    "Asynchronous variant of results"
+    try:
+        with stats.timer("gather"):
+            vals = await ftrs[0].client.gather(ftrs, asynchronous=True)
+    except Exception:
+        await wait(ftrs)
+        errors = {}
+        for idx, ftr in zip(idxs, ftrs):
+            if ftr.status == "error":
+                errors[idx] = await ftr.exception()
+        _raise_errors(errors, len(args))
+        raise
+    if stats.enabled:
+        stats.record(stats.method(), "gather", 0, nbytes(vals), count=0)
+    return _insert_results(args, idxs, vals)
+
+
 def results(*args):
-    "Returns the results of the futures in args"
-    return tuple(arg.result() if isinstance(arg, Future) else arg for arg in args)
+    """
+    Returns the results of the futures in args gathering them at once.
+    If the futures failed on more than one worker, a DistributedError is raised
+    reporting all of them. If the client is asynchronous an awaitable is returned.
+    """
+    idxs = tuple(i for i, arg in enumerate(args) if isinstance(arg, Future))
+    if not idxs:
+        return args
+    ftrs = [args[i] for i in idxs]
+    client = ftrs[0].client
+    if client.asynchronous:
+        return _async_results(args, idxs, ftrs)
+
+    try:
+        with stats.timer("gather"):
+            vals = client.gather(ftrs)
+    except Exception:
+        wait(ftrs)
+        errors = {
+            idx: ftr.exception()
+            for idx, ftr in zip(idxs, ftrs)
+            if ftr.status == "error"
+        }
+        _raise_errors(errors, len(args))
+        raise
+    if stats.enabled:
+        stats.record(stats.method(), "gather", 0, nbytes(vals), count=0)
+    return _insert_results(args, idxs, vals)
 
 
 class Distributed:
@@ -48,6 +184,9 @@ class Distributed:
         "_type",
         "_constants",
         "_keys",
+        "_indexes",
+        "_array_meta",
+        "__weakref__",
     ]
 
     def __init__(self, dask, cls=None):
@@ -57,12 +196,29 @@ class Distributed:
             self._type = cls
 
     def wait(self):
-        "Waits for all the distributed futures to be completed and raises errors if any"
+        """
+        Waits for all the distributed futures to be completed and raises errors if any.
+        If the client is asynchronous an awaitable is returned.
+        """
+        if self.client.asynchronous:
+            return self._async_wait()
         for ftr in as_completed(self.dask):
             if ftr.status == "error":
                 ftr.result()
         return self
 
+    async def _async_wait(self):
+        "Asynchronous variant of wait"
+        await wait(self.dask)
+        for ftr in self.dask:
+            if ftr.status == "error":
+                await ftr.result()
+        return self
+
+    def __await__(self):
+        "Awaits for the futures to be completed; requires an asynchronous client"
+        return self._async_wait().__await__()
+
     @property
     def dask(self):
         "Returns the low-level dask objects"
@@ -83,20 +239,63 @@ class Distributed:
         "Returns the Client managing the distributed objects"
         return next(iter(self)).client
 
-    @compute_property
+    @remote_property
     def workers(self):
-        "Returns the of workers holding the distributed objects"
-        return tuple(map(next, map(iter, map(self.client.who_has, self.wait()))))
+        """
+        Returns the of workers holding the distributed objects.
+        The owners are located by the client with at most one call to the scheduler.
+        """
+        return then(self.client.locate(self.dask), tuple)
+
+    @remote_property
+    def array_meta(self):
+        """
+        Returns the (dtype, shape) of the distributed arrays.
+        The values known by the client, e.g. stored when placing the chunks,
+        are used directly; the others are fetched with a single gather.
+        """
+        return then(self.client.array_meta(self.dask), tuple)
 
     @compute_property
     def type(self):
         "Returns the class of the distributed objects"
         return next(iter(self.wait())).type
 
+    def _resolved(self, attr):
+        """
+        Returns the value of the remote property attr for synchronous use.
+        With asynchronous clients the value must have been awaited before,
+        as done for the workers and ranks of the communicators.
+        """
+        prop = getattr(type(self), attr, None)
+        if not isinstance(prop, remote_property) or not self.client.asynchronous:
+            return getattr(self, attr)
+        try:
+            return copy(getattr(self, prop.key))
+        except AttributeError:
+            raise RuntimeError(
+                f"{attr} must be awaited first with asynchronous clients"
+            ) from None
+
+    def _get_index(self, attr):
+        "Returns a dict mapping the values of attr (or of the method attr) to their index"
+        try:
+            indexes = self._indexes
+        except AttributeError:
+            indexes = self._indexes = {}
+        try:
+            return indexes[attr]
+        except KeyError:
+            vals = self._resolved(attr)
+            if callable(vals):
+                vals = vals()
+            indexes[attr] = {val: idx for idx, val in enumerate(vals)}
+            return indexes[attr]
+
     def index(self, key):
         "Returns the index of the dask futures (self.dask) for a given key"
-        if isinstance(key, str) and key in self.workers:
-            return self.workers.index(key)
+        if isinstance(key, str) and key in self._get_index("workers"):
+            return self._get_index("workers")[key]
         raise KeyError(f"Key {key} not found")
 
     def __iter__(self):
@@ -118,6 +317,14 @@ class Distributed:
             return cls._get_finalize(fnc.fget)
         return lambda _, **__: _
 
+    @classmethod
+    def _is_pure(cls, fnc):
+        "Whether the return annotation of fnc marks it as pure"
+        finalize = cls._get_finalize(fnc)
+        if isinstance(finalize, partial):
+            finalize = finalize.func
+        return getattr(finalize, "pure", False)
+
     def _finalize(self, fnc, value, **kwargs):
         try:
             return fnc(value, caller=self, **kwargs)
@@ -135,9 +342,9 @@ class Distributed:
         return tuple(args)
 
     @classmethod
-    def _remote_call(cls, fnc, *args, **kwargs):
+    def _remote_call(cls, fnc, *args, _pure=False, **kwargs):
         if isdistributed(fnc):
-            call = lambda fnc, *args, **kwargs: fnc(*args, **kwargs)
+            call = _call
             args = (fnc,) + args
         else:
             if not callable(fnc):
@@ -146,12 +353,13 @@ class Distributed:
 
         keys = []
         vals = []
+        rest = []
         for i, arg in enumerate(args):
             if isdistributed(arg):
                 keys.append(i)
                 vals.append(arg)
-
-        args = tuple(arg for i, arg in enumerate(args) if i not in keys)
+            else:
+                rest.append(arg)
         n_args = len(keys)
 
         for key, arg in list(kwargs.items()):
@@ -164,46 +372,163 @@ class Distributed:
             raise ValueError("No distributed argument found when calling fnc")
 
         client = next(iter(vals[0])).client
-
-        return Distributed(
-            client.map(
-                lambda *vals: call(
-                    *Distributed._insert_args(keys[:n_args], vals[:n_args], *args),
-                    **kwargs,
-                    **dict(zip(keys[n_args:], vals[n_args:])),
+        call_type = call if isclass(call) else None
+        if stats.enabled:
+            call = partial(timed, stats.method() or _name(call), call)
+
+        with stats.timer("submit"):
+            return Distributed(
+                client.map(
+                    partial(_apply, call, tuple(keys), n_args, tuple(rest), kwargs),
+                    *map(tuple, vals),
+                    pure=_pure,
                 ),
-                *vals,
-                pure=False,  # TODO: add support for pure functions
-            ),
-            cls=call if isclass(call) else None,
+                cls=call_type,
+            )
+
+    @staticmethod
+    def _batch_call(call):
+        "Auxiliary function that normalizes a call of batch into (key, args, kwargs)"
+        if isinstance(call, str):
+            return call, (), {}
+        call = tuple(call)
+        return call + ((), {})[len(call) - 1 :]
+
+    @staticmethod
+    def _call_batch(obj, calls):
+        "Auxiliary function that executes on obj the calls of batch"
+        out = []
+        for key, is_callable, args, kwargs in calls:
+            attr = getattr(obj, key)
+            out.append(attr(*args, **kwargs) if is_callable else attr)
+        return tuple(out)
+
+    def batch(self, *calls):
+        """
+        Executes several calls on the distributed objects with a single remote call,
+        i.e. one task per worker. Returns a tuple with the result of each call.
+
+        Parameters
+        ----------
+        calls: str or tuple
+            Each call is either the name of an attribute or a tuple (key, args, kwargs),
+            where args and kwargs are optional and must not be distributed.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .abc import Result, Array
+
+        calls = tuple(map(self._batch_call, calls))
+        remote = []
+        # The finalizer of each call sent to the workers, decided before finalizing
+        # since the finalizers may add new constants
+        finalizers = []
+        for key, args, kwargs in calls:
+            if key in self._constants:
+                finalizers.append(None)
+                continue
+            if anydistributed(*args, **kwargs):
+                raise ValueError("Distributed arguments are not supported in batch")
+            dispatch = _get_dispatch(self.type, key)
+            finalize = self._get_finalize(None) if dispatch is None else dispatch[1]
+            gather = (
+                isclass(finalize)
+                and issubclass(finalize, Result)
+                and not issubclass(finalize, Array)
+            )
+            finalizers.append((finalize, gather))
+            remote.append((key, dispatch is not None and dispatch[2], args, kwargs))
+
+        selected = [
+            idx
+            for idx, (_, gather) in enumerate(filter(None, finalizers))
+            if not gather
+        ]
+        ftrs, items = (
+            self._submit_batch(tuple(remote), selected) if remote else ({}, {})
         )
+        values = None
+        out = []
+        idx = 0
+        for (key, _, _), finalizer in zip(calls, finalizers):
+            if finalizer is None:
+                out.append(self._constants[key])
+                continue
+            finalize, gather = finalizer
+            if gather:
+                # Results are gathered once for all the calls
+                if values is None:
+                    values = results(*ftrs)
+                res = tuple(val[idx] for val in values)
+            else:
+                res = Distributed(items[idx])
+            out.append(select_kwargs(finalize, res, caller=self, key=key))
+            idx += 1
+        return tuple(out)
+
+    def _submit_batch(self, calls, selected):
+        """
+        Submits with a single graph the calls of batch, one task per worker,
+        and the selection of the result of the calls in selected.
+        Returns the futures of the tasks and a dict {call index: futures}.
+        """
+        fnc = partial(Distributed._call_batch, calls=calls)
+        if stats.enabled:
+            fnc = partial(timed, stats.method() or "_call_batch", fnc)
+        name = f"batch-{uuid.uuid4()}"
+        dsk = {(name, _i): (fnc, ftr) for _i, ftr in enumerate(self.dask)}
+        keys = [[(name, _i) for _i in range(len(self))]]
+        for idx in selected:
+            dsk.update(
+                {
+                    (f"{name}-{idx}", _i): (itemgetter(idx), (name, _i))
+                    for _i in range(len(self))
+                }
+            )
+            keys.append([(f"{name}-{idx}", _i) for _i in range(len(self))])
+        with stats.timer("submit"):
+            futures = self.client.get(dsk, keys, sync=False)
+        return futures[0], dict(zip(selected, futures[1:]))
 
     def __callattr__(self, key, *args, **kwargs):
-        fnc = getattr(self.type, key)
-        caller = lambda fnc, arg: select_kwargs(fnc, arg, caller=self, key=key)
-        args, kwargs = apply_annotations(fnc, self, *args, _caller=caller, **kwargs)
-        finalize = self._get_finalize(fnc)
-        return caller(finalize, self._remote_call(fnc, *args, **kwargs))
+        with stats.call(key):
+            fnc, finalize, _, pure, annotated = _get_dispatch(self.type, key)
+            caller = lambda fnc, arg: select_kwargs(fnc, arg, caller=self, key=key)
+            if annotated:
+                with stats.timer("annotations"):
+                    args, kwargs = apply_annotations(
+                        fnc, self, *args, _caller=caller, **kwargs
+                    )
+            else:
+                args = (self,) + args
+            ftrs = self._remote_call(fnc, *args, _pure=pure, **kwargs)
+            with stats.timer("finalize"):
+                return caller(finalize, ftrs)
 
     def __getattr__(self, key):
         if key in self._constants:
+            if self.client.asynchronous:
+                return async_value(self._constants[key])
             return self._constants[key]
-        if key in dir(type(self)):
+        if key in _type_attrs(type(self)):
             return getattr(type(self), key).__get__(self)
-        try:
-            attr = getattr(self.type, key)
-            finalize = self._get_finalize(attr)
-            if callable(attr):
-                fnc = lambda *args, **kwargs: self.__callattr__(key, *args, **kwargs)
+        with stats.call(key):
+            with stats.timer("dispatch"):
+                try:
+                    dispatch = _get_dispatch(self.type, key)
+                except AttributeError:
+                    dispatch = None
+            if dispatch is None:
+                return self._remote_call(getattr, self, key)
+
+            attr, finalize, is_callable, pure, _ = dispatch
+            if is_callable:
+                fnc = partial(self.__callattr__, key)
                 if interactive():
                     return wraps(attr)(fnc)
                 return fnc
-            return select_kwargs(
-                finalize, self._remote_call(getattr, self, key), key=key, caller=self
-            )
-        except AttributeError:
-            pass
-        return self._remote_call(getattr, self, key)
+            ftrs = self._remote_call(getattr, self, key, _pure=pure)
+            with stats.timer("finalize"):
+                return select_kwargs(finalize, ftrs, key=key, caller=self)
 
     def _set_and_return(self, key, val):
         "Auxiliary function used by __setattr__"
@@ -211,7 +536,7 @@ class Distributed:
         return self
 
     def __setattr__(self, key, val):
-        if key in dir(type(self)):
+        if key in _type_attrs(type(self)):
             super().__setattr__(key, val)
         else:
             self._dask = self._remote_call(
@@ -227,6 +552,30 @@ class Distributed:
         return self.dask == other
 
 
+async def async_value(value):
+    "Returns value as an awaitable; used for cached values with asynchronous clients"
+    return value
+
+
+def _name(fnc):
+    "Returns the name of fnc used by the stats of Distributed._remote_call"
+    return getattr(fnc, "__name__", type(fnc).__name__)
+
+
+def _call(fnc, *args, **kwargs):
+    "Calls a distributed function; used by Distributed._remote_call"
+    return fnc(*args, **kwargs)
+
+
+def _apply(call, keys, n_args, args, kwargs, *vals):
+    "Calls `call` inserting the distributed values; used by Distributed._remote_call"
+    return call(
+        *Distributed._insert_args(keys[:n_args], vals[:n_args], *args),
+        **kwargs,
+        **dict(zip(keys[n_args:], vals[n_args:])),
+    )
+
+
 class Local:
     "Mock class for enabling functions of Distributed into a local class"
 
@@ -254,6 +603,17 @@ class Local:
         "Mock of Distributed.wait"
         return self
 
+    def batch(self, *calls):
+        "Mock of Distributed.batch"
+        calls = map(Distributed._batch_call, calls)
+        return Distributed._call_batch(
+            self,
+            tuple(
+                (key, callable(getattr(type(self), key, None)), args, kwargs)
+                for key, args, kwargs in calls
+            ),
+        )
+
     def index(self, key):
         "Mock of Distributed.index"
         if key in self.workers:
@@ -0,0 +1,232 @@
+"Opt-in instrumentation of the remote calls"
+
+__all__ = [
+    "Stats",
+    "stats",
+]
+
+from time import perf_counter
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1, 10, float("inf"))
+PHASES = (
+    "dispatch",
+    "annotations",
+    "arrays",
+    "submit",
+    "execute",
+    "finalize",
+    "gather",
+)
+
+_method = ContextVar("method", default=None)
+
+
+class Record:
+    "Counters and latency histogram of a (method, phase) pair"
+
+    __slots__ = ["count", "seconds", "nbytes", "buckets"]
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.nbytes = 0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, seconds, nbytes=0, count=1):
+        "Adds a measurement to the record"
+        self.count += count
+        self.seconds += seconds
+        self.nbytes += nbytes
+        self.buckets[bisect_left(BUCKETS, seconds)] += count
+
+    def merge(self, other):
+        "Merges another record into this one"
+        self.count += other.count
+        self.seconds += other.seconds
+        self.nbytes += other.nbytes
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+class Stats:
+    """
+    Collects per-method counters, latency histograms and bytes transferred
+    by the remote calls of Distributed objects. Disabled by default.
+
+    The phases of a call are: dispatch (__getattr__), annotations (apply_annotations),
+    arrays (conversion of dask arrays to futures in Cartesian), submit (client.map),
+    execute (the call on the workers), finalize (the return annotation) and gather
+    (results). The execute phase is recorded on the workers and fetched with `gather`.
+    """
+
+    __slots__ = ["enabled", "records"]
+
+    def __init__(self):
+        self.enabled = False
+        self.records = {}
+
+    def enable(self):
+        "Enables the instrumentation"
+        self.enabled = True
+        return self
+
+    def disable(self):
+        "Disables the instrumentation"
+        self.enabled = False
+        return self
+
+    def reset(self):
+        "Removes all the records"
+        self.records.clear()
+        return self
+
+    def __enter__(self):
+        return self.reset().enable()
+
+    def __exit__(self, *args):
+        self.disable()
+
+    @staticmethod
+    def method():
+        "The name of the method currently being called"
+        return _method.get()
+
+    def record(self, method, phase, seconds, nbytes=0, count=1):
+        "Records a measurement of phase for method; use count=0 for adding only bytes"
+        key = (method or "unknown", phase)
+        try:
+            rec = self.records[key]
+        except KeyError:
+            rec = self.records[key] = Record()
+        rec.add(seconds, nbytes, count)
+
+    def call(self, method):
+        "Context manager that sets the method recorded by the nested phases"
+        if not self.enabled or _method.get() is not None:
+            return nullcontext()
+        return self._call(method)
+
+    @staticmethod
+    @contextmanager
+    def _call(method):
+        "Auxiliary function used by call"
+        token = _method.set(method)
+        try:
+            yield
+        finally:
+            _method.reset(token)
+
+    def timer(self, phase):
+        "Context manager that records the time spent in phase"
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(phase)
+
+    @contextmanager
+    def _timer(self, phase):
+        "Auxiliary function used by timer"
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(_method.get(), phase, perf_counter() - start)
+
+    def gather(self, client):
+        "Merges the records of the workers of client and clears them on the workers"
+        for recs in client.run(_pop_records).values():
+            for key, rec in recs.items():
+                try:
+                    self.records[key].merge(rec)
+                except KeyError:
+                    self.records[key] = rec
+        return self
+
+    def summary(self):
+        "Returns a table with count, total and mean time and bytes per method and phase"
+        rows = [("method", "phase", "count", "total [s]", "mean [ms]", "bytes")]
+        for (method, phase), rec in sorted(
+            self.records.items(), key=lambda item: (item[0][0], _phase_idx(item[0][1]))
+        ):
+            rows.append(
+                (
+                    method,
+                    phase,
+                    str(rec.count),
+                    f"{rec.seconds:.6f}",
+                    f"{rec.seconds / max(rec.count, 1) * 1e3:.3f}",
+                    str(rec.nbytes),
+                )
+            )
+        widths = [max(map(len, col)) for col in zip(*rows)]
+        return "\n".join(
+            "  ".join(val.ljust(width) for val, width in zip(row, widths)).rstrip()
+            for row in rows
+        )
+
+    def prometheus(self, prefix="lyncs_mpi"):
+        """
+        Returns the records in the Prometheus text exposition format,
+        i.e. the format of the metrics exported by the dask dashboard.
+        """
+        lines = [
+            f"# HELP {prefix}_call_seconds Latency of the phases of the remote calls",
+            f"# TYPE {prefix}_call_seconds histogram",
+        ]
+        for (method, phase), rec in sorted(self.records.items()):
+            labels = f'method="{method}",phase="{phase}"'
+            total = 0
+            for bound, count in zip(BUCKETS, rec.buckets):
+                total += count
+                bound = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'{prefix}_call_seconds_bucket{{{labels},le="{bound}"}} {total}'
+                )
+            lines.append(f"{prefix}_call_seconds_sum{{{labels}}} {rec.seconds}")
+            lines.append(f"{prefix}_call_seconds_count{{{labels}}} {rec.count}")
+        lines += [
+            f"# HELP {prefix}_call_bytes Bytes transferred by the remote calls",
+            f"# TYPE {prefix}_call_bytes counter",
+        ]
+        for (method, phase), rec in sorted(self.records.items()):
+            if rec.nbytes:
+                lines.append(
+                    f'{prefix}_call_bytes{{method="{method}",phase="{phase}"}} {rec.nbytes}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self):
+        return self.summary()
+
+
+stats = Stats()
+
+
+def _phase_idx(phase):
+    "Order of the phases in the summary"
+    return PHASES.index(phase) if phase in PHASES else len(PHASES)
+
+
+def _pop_records():
+    "Returns and clears the records of the worker; used by Stats.gather"
+    records = dict(stats.records)
+    stats.reset()
+    return records
+
+
+def timed(method, call, *args, **kwargs):
+    "Calls `call` recording the execute time on the worker; used by Distributed._remote_call"
+    start = perf_counter()
+    try:
+        return call(*args, **kwargs)
+    finally:
+        stats.record(method, "execute", perf_counter() - start)
+
+
+def nbytes(values):
+    "Returns the size in bytes of the values"
+    # pylint: disable=import-outside-toplevel
+    from dask.sizeof import sizeof
+
+    return sum(map(sizeof, values))
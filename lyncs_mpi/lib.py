@@ -1,23 +1,46 @@
 "Loading and using MPI via cppyy"
 
 __all__ = [
-    "lib",
+    "get_lib",
     "default_comm",
     "initialized",
     "finalized",
 ]
 
 from ctypes import c_int
-from lyncs_cppyy import Lib
 from .config import MPI_INCLUDE_DIRS, MPI_LIBRARIES
 
-lib = Lib(
-    include=MPI_INCLUDE_DIRS.split(";"),
-    header="mpi.h",
-    library=MPI_LIBRARIES.split(";"),
-    c_include=False,
-    check="MPI_Init",
-)
+
+LIB = None
+
+
+def get_lib():
+    "Returns lib creating it on first use, such that cppyy is imported only if needed"
+    # pylint: disable=import-outside-toplevel,global-statement
+    global LIB
+    if LIB is None:
+        from lyncs_cppyy import Lib
+
+        LIB = Lib(
+            include=MPI_INCLUDE_DIRS.split(";"),
+            header="mpi.h",
+            library=MPI_LIBRARIES.split(";"),
+            c_include=False,
+            check="MPI_Init",
+        )
+    return LIB
+
+
+def __getattr__(key):
+    """
+    The attributes of the MPI library are accessible from this module, e.g. lib.MPI_Init,
+    and lib.lib returns the library itself. They are loaded on first use (PEP 562).
+    """
+    if key.startswith("_"):
+        raise AttributeError(f"module {__name__} has no attribute {key}")
+    if key == "lib":
+        return get_lib()
+    return getattr(get_lib(), key)
 
 
 COMM = None
@@ -36,12 +59,12 @@ def default_comm():
 def initialized():
     "Whether MPI has been initialized"
     val = c_int(0)
-    lib.MPI_Initialized(val)
+    get_lib().MPI_Initialized(val)
     return bool(val)
 
 
 def finalized():
     "Whether MPI has been finalized"
     val = c_int(0)
-    lib.MPI_Finalized(val)
+    get_lib().MPI_Finalized(val)
     return bool(val)
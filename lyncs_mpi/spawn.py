@@ -0,0 +1,15 @@
+'Entry point of the MPI server spawned by Client(launch="spawn")'
+
+import sys
+from mpi4py import MPI
+from dask_mpi.cli import main
+
+if __name__ == "__main__":
+    parent = MPI.Comm.Get_parent()
+    try:
+        # click fills the parameters from the arguments
+        # pylint: disable=no-value-for-parameter,unexpected-keyword-arg
+        main(sys.argv[1:], standalone_mode=False)
+    finally:
+        # Disconnecting from the client that is waiting in SpawnServer.wait
+        parent.Disconnect()
@@ -5,7 +5,7 @@ Just some simple classes used by the tests.
 
 from random import random
 import numpy as np
-from .abc import Result, Global, Constant, Array
+from .abc import Pure, Result, Global, Constant, Array
 from .distributed import DistributedClass
 from .cartesian import CartesianClass
 
@@ -25,6 +25,14 @@ class DistributedTest(metaclass=DistributedClass):
         "Returns range(length)"
         return range(length)
 
+    def arange(self, length) -> Pure:
+        "Returns range(length) as a pure function"
+        return range(length)
+
+    def pure_range(self, length) -> Pure(Global):
+        "Returns range(length) as a pure global function"
+        return range(length)
+
     def not_global(self) -> Global:
         "Function for error testing"
         return random()
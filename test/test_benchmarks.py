@@ -1,25 +1,210 @@
+import sys
+import subprocess
+from pytest import mark, fixture
 from dask.base import wait
-from lyncs_mpi import Client
+from lyncs_mpi import Client, Distributed
+from lyncs_mpi.client import IdleServer
+from lyncs_mpi.cart_array import KeyPatch
+from lyncs_mpi.distributed import results
 from lyncs_mpi.testing import CartesianTest
 
-client = Client(2)
-comm = client.create_comm().create_cart((2,))
+pytestmark = mark.benchmark
 
+SIZES = [2**12, 2**18]
 
-def test_bench_init(benchmark):
+
+@fixture(scope="module", params=[2, 4], ids=lambda n: f"{n}workers")
+def client(request):
+    client = Client(request.param)
+    yield client
+    client.close_server()
+
+
+@fixture(scope="module")
+def comm(client):
+    return client.create_comm().create_cart((len(client.comm),))
+
+
+@fixture(scope="module", params=["1d", "2d"])
+def cart(client, request):
+    size = len(client.comm)
+    dims = (size,) if request.param == "1d" else (2, size // 2)
+    return client.create_comm().create_cart(dims)
+
+
+def get_shape(size):
+    "Returns a 2D shape of size elements"
+    return (size // 2**8, 2**8)
+
+
+def throughput(benchmark, calls=1, nbytes=None):
+    "Stores the number of calls and of GB processed per second"
+    benchmark.extra_info["calls"] = calls
+    if nbytes is not None:
+        benchmark.extra_info["bytes"] = nbytes
+    if benchmark.stats is None:
+        return
+    mean = benchmark.stats.stats.mean
+    benchmark.extra_info["calls/s"] = calls / mean
+    if nbytes is not None:
+        benchmark.extra_info["GB/s"] = nbytes / mean / 1e9
+
+
+def moved_bytes(client):
+    "Total bytes received by the workers from other workers"
+    logs = client.run(
+        lambda dask_worker: sum(
+            log["total"] for log in dask_worker.incoming_transfer_log
+        )
+    )
+    return sum(logs.values())
+
+
+def test_bench_import(benchmark):
+    cmd = [sys.executable, "-c", "import lyncs_mpi"]
+    benchmark.pedantic(lambda: subprocess.run(cmd, check=True), rounds=5)
+
+
+@mark.parametrize("num_workers", [1, 2, 4])
+@mark.parametrize("launch", [True, "spawn"], ids=["mpirun", "spawn"])
+def test_bench_startup(benchmark, launch, num_workers):
+    benchmark.pedantic(
+        lambda: Client(num_workers, launch=launch).close_server(), rounds=3
+    )
+
+
+def test_bench_startup_local(benchmark):
+    benchmark(lambda: Client(launch="local").close_server())
+
+
+def test_bench_startup_warm(benchmark):
+    Client(2, keep_alive=60).close_server()
+    benchmark(lambda: Client(2, keep_alive=60).close_server())
+    IdleServer.close_all()
+
+
+def test_bench_create_comm(benchmark, client):
+    benchmark(lambda: client.create_comm(len(client.comm) // 2).wait())
+
+
+@mark.parametrize("cached", [True, False])
+def test_bench_create_cart(benchmark, client, cached):
+    dims = (len(client.comm),)
+    cart = client.comm.create_cart(dims, periods=False) if cached else None
+    benchmark(lambda: client.comm.create_cart(dims, periods=False))
+    del cart
+
+
+def test_bench_init(benchmark, comm):
     benchmark(CartesianTest, (4, 4), comm=comm)
 
 
-def test_bench_result(benchmark):
+def test_bench_remote_call(benchmark, comm):
+    benchmark(lambda: comm.Get_rank().wait())
+    throughput(benchmark, len(comm))
+
+
+def test_bench_result(benchmark, comm):
     test = CartesianTest((4, 4), comm=comm)
     benchmark(test.range, 10)
+    throughput(benchmark, len(comm))
 
 
-def test_bench_array(benchmark):
+def test_bench_values(benchmark, comm):
+    test = CartesianTest((4, 4), comm=comm)
+    benchmark(test.values)
+    throughput(benchmark, len(comm))
+
+
+def test_bench_results(benchmark, comm):
+    futures = comm.Get_rank().wait().dask
+    benchmark(results, *futures)
+    throughput(benchmark, len(comm))
+
+
+def test_bench_batch(benchmark, comm):
+    test = CartesianTest((4, 4), comm=comm)
+    benchmark(test.batch, *(("range", (10,)),) * 10)
+    throughput(benchmark, 10 * len(comm))
+
+
+def test_bench_array(benchmark, comm):
     test = CartesianTest((4, 4), comm=comm)
     benchmark(test.ones)
 
 
-def test_bench_array_wait(benchmark):
+def test_bench_array_wait(benchmark, comm):
     test = CartesianTest((4, 4), comm=comm)
     benchmark(lambda: wait(test.ones()))
+
+
+@mark.parametrize("size", SIZES)
+def test_bench_zeros(benchmark, cart, size):
+    arr = cart.zeros(get_shape(size))
+    benchmark(lambda: wait(cart.zeros(arr.shape)))
+    throughput(benchmark, nbytes=arr.nbytes)
+
+
+@mark.parametrize("size", SIZES)
+def test_bench_array_round_trip(benchmark, cart, size):
+    arr = cart.array(cart.get_futures(cart.ones(get_shape(size)) + 1))
+    benchmark(lambda: cart.array(cart.get_futures(arr)))
+    throughput(benchmark, nbytes=arr.nbytes)
+
+
+def test_bench_who_has(benchmark, comm):
+    futures = comm.Get_rank().wait().dask
+    benchmark(comm.client.who_has, futures)
+    throughput(benchmark, len(comm))
+
+
+def test_bench_workers(benchmark, comm):
+    test = CartesianTest((4, 4), comm=comm)
+    benchmark(lambda: Distributed(test.dask).workers)
+    throughput(benchmark, len(comm))
+
+
+@mark.parametrize("method", ["in_place", "moved", "persist"])
+@mark.parametrize("size", SIZES)
+def test_bench_get_futures(benchmark, cart, size, method):
+    arr = cart.array(cart.get_futures(cart.ones(get_shape(size)) + 1))
+    if method == "moved":
+        arr = cart.array(cart.get_futures(arr)[::-1])
+
+    start = moved_bytes(cart.client)
+    wait(cart.get_futures(arr))
+    benchmark.extra_info["moved_bytes"] = moved_bytes(cart.client) - start
+    if method == "persist":
+        # Baseline: restricting every chunk to its worker and persisting the array
+        keys = {ftr.key: key for key, ftr in arr.dask.items()}
+        restrictions = {
+            KeyPatch(keys[ftr.key]): worker
+            for ftr, worker in zip(cart.get_futures(arr), cart.workers)
+        }
+        benchmark(lambda: wait(arr.persist(workers=restrictions)))
+    else:
+        benchmark(lambda: wait(cart.get_futures(arr)))
+    throughput(benchmark, nbytes=arr.nbytes)
+
+
+@mark.parametrize("method", ["mpi", "rechunk"])
+@mark.parametrize("size", SIZES)
+def test_bench_transpose(benchmark, comm, size, method):
+    arr = comm.array(comm.get_futures(comm.ones(get_shape(size)) + 1))
+    if method == "mpi":
+        benchmark(lambda: wait(comm.transpose(arr, 0, 1)))
+    else:
+        chunks = comm.transpose(arr, 0, 1).chunks
+        benchmark(lambda: wait(arr.rechunk(chunks).persist()))
+    throughput(benchmark, nbytes=arr.nbytes)
+
+
+@mark.parametrize("size", SIZES)
+def test_bench_redistribute(benchmark, comm, cart, size):
+    arr = comm.array(comm.get_futures(comm.ones(get_shape(size)) + 1))
+
+    start = moved_bytes(comm.client)
+    wait(comm.redistribute(arr, cart))
+    benchmark.extra_info["moved_bytes"] = moved_bytes(comm.client) - start
+    benchmark(lambda: wait(comm.redistribute(arr, cart)))
+    throughput(benchmark, nbytes=arr.nbytes)
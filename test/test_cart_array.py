@@ -1,5 +1,10 @@
 from pytest import raises
-from lyncs_mpi import Client
+import numpy as np
+import dask.array as da
+from mpi4py import MPI
+from dask.distributed import wait
+from lyncs_mpi import Client, Distributed
+from lyncs_mpi.distributed import results
 
 
 def test_array():
@@ -18,7 +23,38 @@ def test_array():
         assert arr.sum() == 16
         assert tuple(arr.dask.keys()) == tuple(val.key for val in arr.dask.values())
 
+    assert cart.get_chunks((7, 3, 2)) == ((4, 3), (2, 1), (2,))
+    arr = cart.ones((7, 3))
+    assert arr.chunks == ((4, 3), (2, 1))
+    assert arr.sum() == 21
+    assert cart.array(cart.get_futures(arr)).chunks == arr.chunks
+
+    data = np.arange(20).reshape(5, 4)
+    dist = Distributed(cart.get_futures(da.from_array(data, chunks=((3, 2), (2, 2)))))
+    assert dist.array_meta[0] == (data.dtype, (3, 2))
+    arr = cart.array(dist)
+    assert arr.chunks == ((3, 2), (2, 2))
+    assert (arr.compute() == data).all()
+
+    # The metadata is fetched at most once and not for chunks placed by the cart
+    maps = []
+    client_map = client.map
+    client.map = lambda fnc, *args, **kwargs: (
+        maps.append(fnc.__name__) or client_map(fnc, *args, **kwargs)
+    )
+    futures = cart.get_futures(cart.ones((4, 4)))
+    assert cart.array(futures).chunks == cart.array(futures).chunks == ((2, 2), (2, 2))
+    futures = [
+        client.submit(np.ones, (2, 2), workers=wrk, pure=False) for wrk in cart.workers
+    ]
+    assert cart.array(futures).chunks == cart.array(futures).chunks == ((2, 2), (2, 2))
+    del client.map
+    assert maps == ["_get_array_meta"]
+
     # Test errors
+    with raises(ValueError):
+        cart.get_chunks_of(((2, 2),) * 3 + ((3, 2),))
+
     with raises(ValueError):
         cart.ones((1, 2))
 
@@ -40,3 +76,197 @@ def test_array():
 
     with raises(ValueError):
         cart2.ones((4, 4))
+
+    data = np.arange(45).reshape(5, 3, 3)
+    arr = cart2.array(
+        cart2.get_futures(da.from_array(data, chunks=cart2.get_chunks(data.shape)))
+    )
+    res = cart2.redistribute(arr, cart)
+    assert res.chunks == ((3, 2), (2, 1), (3,))
+    assert cart.get_futures(res) == list(res.dask.values())
+    assert (res.compute() == data).all()
+    back = cart.redistribute(res, cart2)
+    assert back.chunks == arr.chunks
+    assert (back.compute() == data).all()
+    assert list(cart2.redistribute(arr, cart2).dask.values()) == cart2.get_futures(arr)
+
+    with raises(TypeError):
+        cart.redistribute(res, client.comm)
+
+    # Across communicators of different sizes, reusing the chunks in place
+    cart1 = client.create_comm(2).create_cart((2,))
+    cart3 = client.create_comm(3).create_cart((3,))
+    data = np.arange(7)
+    arr = cart1.array(cart1.get_futures(da.from_array(data, chunks=((4, 3),))))
+    res = cart1.redistribute(arr, cart3)
+    assert res.chunks == ((3, 2, 2),)
+    assert res.name != arr.name
+    assert (res.compute() == data).all()
+    arr = cart1.array(cart1.get_futures(da.arange(4, chunks=2)))
+    res = cart1.redistribute(arr, cart3)
+    assert res.chunks == ((2, 1, 1),)
+    assert (res.compute() == np.arange(4)).all()
+    assert (cart3.redistribute(res, cart1).compute() == np.arange(4)).all()
+
+
+def test_get_futures_in_place():
+    client = Client(num_workers=4, launch=True)
+    cart = client.comm.create_cart([2, 2, 1])
+
+    for shape in (4, 4), (4, 2, 2):
+        futures = cart.get_futures(cart.ones(shape))
+        arr = cart.array(futures)
+        assert cart.get_futures(arr) == futures
+
+        moved = cart.get_futures(cart.array(futures[::-1]))
+        wait(moved)
+        who_has = client.who_has(moved, overload=False)
+        assert all(wrk in who_has[ftr.key] for ftr, wrk in zip(moved, cart.workers))
+        assert arr.sum() == 16
+
+    client.close_server()
+
+
+def test_reorder():
+    client = Client(num_workers=4, launch=True)
+    cart = client.comm.create_cart([2, 2], reorder=True)
+    assert cart.ranks == tuple(range(4))
+    assert cart.coords == tuple(map(tuple, results(*cart.Get_coords(cart.rank))))
+
+    data = np.arange(16).reshape(4, 4)
+    arr = da.from_array(data, chunks=2)
+    futures = cart.get_futures(arr)
+    wait(futures)
+    assert cart.workers == tuple(client.who_has(ftr)[0] for ftr in futures)
+    for ftr, (x, y) in zip(futures, cart.coords):
+        assert (ftr.result() == data[2 * x : 2 * x + 2, 2 * y : 2 * y + 2]).all()
+
+    futures = cart.get_futures(cart.ones((4, 4)))
+    wait(futures)
+    for ftr, worker in zip(futures, cart.ranks_workers.values()):
+        assert client.who_has(ftr)[0] == worker
+
+    client.close_server()
+
+
+def test_halo_exchange():
+    client = Client(num_workers=4, launch=True)
+    data = np.arange(32).reshape(4, 4, 2)
+
+    for periods, mode in (True, "wrap"), (False, "constant"):
+        cart = client.comm.create_cart([2, 2], periods=periods)
+        futures = cart.get_futures(da.from_array(data, chunks=(2, 2, 2)))
+        arr = cart.array(futures)
+
+        halo = cart.halo_exchange(arr, 1)
+        assert halo.shape == (8, 8, 2)
+        assert halo.chunks == ((4, 4), (4, 4), (2,))
+
+        padded = np.pad(data, ((1, 1), (1, 1), (0, 0)), mode=mode)
+        futures = cart.get_futures(halo)
+        wait(futures)
+        for ftr, worker, (x, y) in zip(futures, cart.workers, cart.coords):
+            assert client.who_has(ftr)[0] == worker
+            assert (ftr.result() == padded[2 * x : 2 * x + 4, 2 * y : 2 * y + 4]).all()
+
+    halo = cart.halo_exchange(arr, {2: 1})
+    assert halo.shape == (4, 4, 4)
+    assert (halo.compute()[..., 1:-1] == data).all()
+
+    with raises(ValueError):
+        cart.halo_exchange(arr, 3)
+
+    with raises(ValueError):
+        cart.halo_exchange(arr, 1, axes=(3,))
+
+    client.close_server()
+
+
+def test_reduce():
+    client = Client(num_workers=4, launch=True)
+    cart = client.comm.create_cart([2, 2])
+    data = np.arange(1, 17, dtype=float).reshape(4, 4)
+    arr = cart.array(cart.get_futures(da.from_array(data, chunks=2)))
+
+    assert cart.reduce(arr) == data.sum()
+    for op, fnc in (
+        ("sum", np.sum),
+        ("prod", np.prod),
+        ("max", np.max),
+        ("min", np.min),
+        ("norm", np.linalg.norm),
+    ):
+        assert np.isclose(cart.reduce(arr, op), fnc(data))
+        assert np.allclose(results(*cart.allreduce(arr, op)), fnc(data))
+
+    for axis in 0, 1:
+        assert np.allclose(cart.reduce(arr, axis=axis).compute(), data.sum(axis=axis))
+        vals = results(*cart.allreduce(arr, "max", axis=axis))
+        for val, coord in zip(vals, cart.coords):
+            idx = coord[1 - axis]
+            assert np.allclose(val, data.max(axis=axis)[2 * idx : 2 * idx + 2])
+
+    assert results(*cart.allreduce(cart.rank)) == (6,) * 4
+    # The MPI reduce(sendobj, op, root) is called with the same arguments
+    vals = results(*cart.reduce(cart.rank, MPI.SUM, 1))
+    assert vals[cart.index(1)] == 6 and vals.count(None) == 3
+
+    with raises(TypeError):
+        cart.reduce(cart.rank, axis=0)
+
+    with raises(TypeError):
+        cart.reduce(arr, "sum", 0)
+
+    for row in cart.sub([False, True]).values():
+        vec = row.ones((6,))
+        assert row.get_futures(vec) == list(row.get_futures(vec))
+        assert row.reduce(vec) == 6
+        assert results(*row.allreduce(row.rank)) == (1, 1)
+
+    with raises(ValueError):
+        cart.reduce(arr, "foo")
+
+    with raises(ValueError):
+        cart.allreduce(arr, axis=2)
+
+    client.close_server()
+
+
+def test_fft():
+    client = Client(num_workers=4, launch=True)
+    cart = client.comm.create_cart([2, 2])
+    data = np.random.rand(4, 5, 3) + 1j * np.random.rand(4, 5, 3)
+    arr = cart.array(cart.get_futures(da.from_array(data, chunks=(2, 3, 3))))
+
+    trans = cart.transpose(arr, 0, 2)
+    assert trans.chunks == ((4,), (3, 2), (2, 1))
+    # the unrestricted results of transpose are located by the scheduler
+    assert not any(ftr in client._owners for ftr in client.futures_of(trans))
+    assert np.allclose(trans.compute(), data)
+    back = cart.transpose(trans, -1, 0)
+    assert back.chunks == arr.chunks
+    assert np.allclose(back.compute(), data)
+    owners = client.who_has(cart.get_futures(arr))
+    assert client.who_has(cart.get_futures(back)) == owners
+
+    assert cart.transpose(arr, 1, 2, chunks=(1, 2)).chunks[2] == (1, 2)
+    assert np.allclose(cart.fft(arr).compute(), np.fft.fftn(data))
+    assert np.allclose(cart.fft(arr, axes=(1,)).compute(), np.fft.fft(data, axis=1))
+    assert np.allclose(cart.ifft(cart.fft(arr, norm="ortho"), norm="ortho"), data)
+
+    with raises(ValueError):
+        cart.transpose(arr, 0, 1)
+
+    with raises(ValueError):
+        cart.transpose(arr, 2, 0)
+
+    with raises(ValueError):
+        cart.transpose(arr, 0, 3)
+
+    with raises(ValueError):
+        cart.transpose(arr, 0, 2, chunks=(4,))
+
+    with raises(ValueError):
+        cart.fft(cart.ones((4, 4)))
+
+    client.close_server()
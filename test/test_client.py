@@ -1,12 +1,18 @@
 import os
 import sys
+import time
+import asyncio
 import sh
 import tempfile
 from pytest import raises
+from mpi4py import MPI
 from lyncs_mpi import (
     Client,
     default_client,
 )
+from dask.distributed import TimeoutError
+from lyncs_mpi.client import IdleServer, parse_cpulist
+from lyncs_mpi.testing import DistributedTest
 
 
 def test_client():
@@ -15,15 +21,24 @@ def test_client():
     assert default_client() is client
     assert len(client.workers) == 1
 
+    with raises(TimeoutError):
+        client.wait_for_workers(2, timeout=0.1)
+
+    with raises(TimeoutError):
+        client.wait_for_workers(2, timeout=0.1, progress=True)
+
     with raises(RuntimeError):
         client.select_workers(2)
 
     with raises(RuntimeError):
         client.select_workers(1, exclude=client.workers)
 
-    with raises(NotImplementedError):
+    with raises(RuntimeError):
         client.select_workers(1, resources="GPU")
 
+    assert set(client.topology) == set(client.workers)
+    assert client.select_workers(1) == list(client.workers)
+
     client.close_server()
     assert client._server is None
 
@@ -34,6 +49,14 @@ def test_client():
     client.__del__()
 
 
+def test_parse_cpulist():
+    assert parse_cpulist("0-3\n") == {0, 1, 2, 3}
+    assert parse_cpulist("5") == {5}
+    assert parse_cpulist("0-1,4,8-9") == {0, 1, 4, 8, 9}
+    assert parse_cpulist("2,,3,") == {2, 3}
+    assert parse_cpulist("") == set()
+
+
 def test_not_launch():
     with raises(RuntimeError):
         Client(launch=False)
@@ -49,3 +72,106 @@ def test_not_launch():
     )
     sh.cd(pwd)
     assert test.exit_code == 0
+
+
+def test_async():
+    async def run():
+        async with Client(num_workers=2, asynchronous=True, progress=True) as client:
+            assert default_client() is client
+            comm = client.comm
+            assert await comm.ranks == (0, 1)
+            assert await comm.ranks == (0, 1)
+            assert set(await comm.workers) == set(client.workers)
+
+            init = await client.scatter((1, 2), workers=list(client.ranks))
+            test = DistributedTest(init)
+            assert await test is test
+            assert await test.wait() is test
+            assert await test.ten == 10
+            assert "ten" in test._constants
+            assert await test.ten == 10
+            assert await test.values() == (1, 2)
+            assert await asyncio.gather(*map(test.range, range(3))) == list(
+                map(range, range(3))
+            )
+            with raises(RuntimeError):
+                await test.not_global()
+
+            cart = await comm.create_cart((2,))
+            assert cart.dims == (2,)
+            assert cart.coords == ((0,), (1,))
+            assert await comm.create_cart((2,)) is cart
+            assert await cart.ranks == (0, 1)
+            assert comm.index(1) == 1
+            assert comm[(await comm.workers)[1]] is comm.dask[1]
+            assert cart.index(0) == 0
+            assert cart[0] is cart.dask[0]
+            assert cart.index((1,)) == 1
+            arr = cart.ones((4, 4))
+            assert await client.compute(arr.sum()) == 16
+        return client
+
+    client = asyncio.run(run())
+    assert client.server is None
+
+
+def test_local():
+    with raises(ValueError):
+        Client(2, launch="local")
+
+    client = Client(launch="local")
+    assert default_client() is client
+    assert list(client.ranks.values()) == [0]
+    assert client.comm.ranks == (0,)
+
+    cart = client.comm.create_cart((1,))
+    assert cart.coords == ((0,),)
+    assert cart.ones((4, 4)).sum().compute() == 16
+
+    test = DistributedTest(client.scatter([1]))
+    assert test.values() == (1,)
+    assert test.range(3) == range(3)
+
+    client.close_server()
+    assert client.server is None
+
+    async def run():
+        async with Client(launch="local", asynchronous=True) as client:
+            assert await client.comm.ranks == (0,)
+        return client
+
+    assert asyncio.run(run()).server is None
+
+
+def test_spawn():
+    for _ in range(2):
+        client = Client(num_workers=2, launch="spawn")
+        assert len(client.workers) == 2
+        assert client.comm.ranks == (0, 1)
+        cart = client.comm.create_cart((2,))
+        assert cart.ones((4, 4)).sum().compute() == 16
+        client.close_server()
+        assert client.server is None
+
+
+def test_keep_alive():
+    client = Client(launch="local", keep_alive=60)
+    server = client.server
+    cart = client.comm.create_cart((1,))
+    comm = server.worker.data[client.comm.wait().dask[0].key]
+    cart = server.worker.data[cart.dask[0].key]
+    client.close_server()
+    # The communicators are freed before parking the server
+    assert comm == MPI.COMM_NULL
+    assert cart == MPI.COMM_NULL
+    assert client.server is None
+    assert list(IdleServer.servers) == [("local", 1, 1)]
+
+    client = Client(launch="local", keep_alive=0.1)
+    assert client.server is server
+    assert not IdleServer.servers
+    client.close_server()
+
+    time.sleep(1)
+    assert not IdleServer.servers
+    assert server._runner is None
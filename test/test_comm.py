@@ -1,4 +1,7 @@
+import gc
+import time
 from pytest import raises
+from mpi4py import MPI
 from lyncs_mpi import (
     Client,
     default_client,
@@ -12,17 +15,94 @@ def test_comm():
     assert len(comm) == comm.size
     assert set(comm.ranks) == set(range(4))
     assert set(comm.workers) == set(client.workers)
+    assert all(ftr in client._owners for ftr in comm)
+    assert list(comm.workers) == client.who_has(comm.dask)
+    assert client.who_has(comm.dask[::-1]) == list(comm.workers[::-1])
     assert comm[0] == comm[comm.ranks_workers[0]]
 
+    workers = client.select_workers()
+    assert len(workers) == 4
+    if len(set(client.topology.values())) == 1:
+        assert [client.ranks[w] for w in workers] == sorted(client.ranks.values())
+
+    # hosts and NUMA nodes with more workers come first, then ranks are ordered
+    topology = client.topology
+    names = sorted(client.ranks.values())
+    by_name = {name: worker for worker, name in client.ranks.items()}
+    client._topology = {
+        by_name[names[0]]: ("host1", 0),
+        by_name[names[1]]: ("host1", 1),
+        by_name[names[2]]: ("host1", 0),
+        by_name[names[3]]: ("host0", 0),
+    }
+    order = [client.ranks[w] for w in client.select_workers()]
+    assert order == [names[0], names[2], names[1], names[3]]
+    assert [client.ranks[w] for w in client.select_workers(2)] == order[:2]
+    client._topology = topology
+
     with raises(KeyError):
         comm[5]
 
+    assert client.create_comm() is comm
     cart = comm.create_cart([2, 2], periods=True)
+    assert comm.create_cart((2, 2), periods=(1, 1)) is cart
+    assert comm.create_cart([2, 2], periods=False) is not cart
     assert cart.dims == (2, 2)
     assert all(cart.periods)
     assert cart[0] == cart[cart.ranks_coords[0]]
+    assert tuple(map(cart.index, cart.coords)) == tuple(range(4))
+    assert tuple(map(cart.index, cart.ranks)) == tuple(range(4))
+    assert cart.normalize_coords() == cart.coords
+
+    with raises(KeyError):
+        cart.index((2, 0))
+
+    rows = cart.sub([False, True])
+    assert set(rows) == {(0,), (1,)}
+    assert cart.sub((0, 1)) is rows
+    for (x,), row in rows.items():
+        assert cart[x, :] is row and cart[x - 2, :] is row
+        assert row.dims == (2,) and row.periods == (True,)
+        assert row.coords == ((0,), (1,))
+        assert not any(ftr in client._owners for ftr in row)
+        assert row.workers == tuple(cart.workers[cart.index((x, y))] for y in (0, 1))
+    col = cart[:, 1]
+    assert col.coords == ((0,), (1,))
+    assert col.workers == tuple(cart.workers[cart.index((x, 1))] for x in (0, 1))
+
+    with raises(ValueError):
+        cart.sub([True])
+
+    with raises(KeyError):
+        cart[0:1, 0]
+
+    with raises(KeyError):
+        cart[:, 2]
 
     comm1 = client.create_comm(2)
     comm2 = client.create_comm(2, exclude=comm1.workers)
     assert not set(comm1.workers).intersection(comm2.workers)
     assert set(comm1.workers + comm2.workers) == set(client.workers)
+    assert client.create_comm(2) is comm1
+
+    # Released communicators are freed
+    comms = comm1.dask
+    del comm1
+    gc.collect()
+    for _ in range(100):
+        freed = client.map(lambda comm: comm == MPI.COMM_NULL, comms, pure=False)
+        if all(client.gather(freed)):
+            break
+        time.sleep(0.1)
+    else:
+        assert False, "Communicators not freed"
+
+    # The calls pending on a released communicator complete before its Free
+    def allreduce(comm, _):
+        return comm.allreduce(1)
+
+    sleep = client.submit(time.sleep, 1, pure=False)
+    pending = client.map(allreduce, comm2.dask, [sleep] * 2, pure=False)
+    del comm2
+    gc.collect()
+    assert client.gather(pending) == [2, 2]
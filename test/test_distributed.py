@@ -1,6 +1,7 @@
 from pytest import raises
 from lyncs_mpi import Client
 from lyncs_mpi.distributed import *
+from lyncs_mpi.distributed import _get_dispatch
 from lyncs_mpi.testing import DistributedTest
 
 
@@ -20,6 +21,8 @@ def test_local():
 
     assert test.ten == 10
     assert test.range(5) == range(5)
+    assert test.pure_range(5) == range(5)
+    assert test.batch(("range", (5,)), "ten") == (range(5), 10)
 
     with raises(KeyError):
         test["bar"]
@@ -33,6 +36,11 @@ def test_local():
     assert Distributed._set_and_return(test, "value", 1) is test
     assert test.value == 1
 
+    assert _get_dispatch(DistributedTest, "foo") is None
+    attr, _, is_callable, is_pure, _ = _get_dispatch(DistributedTest, "range")
+    assert attr is DistributedTest.range and is_callable and not is_pure
+    assert _get_dispatch(DistributedTest, "pure_range")[3]
+
     assert Distributed._insert_args((), (), 1, 2, 3) == (1, 2, 3)
     assert Distributed._insert_args((0, 2), (1, 3), 2) == (1, 2, 3)
     assert test.value == 1
@@ -43,6 +51,11 @@ def test_distributed():
     init = client.scatter((1, 2))
     assert len(init) == 2
     assert len(set(client.who_has(init))) == 2
+    assert client.locate(init) == client.who_has(init)
+    assert client.locate(init[::-1]) == client.who_has(init)[::-1]
+    assert not any(ftr in client._owners for ftr in init)
+    with raises(ZeroDivisionError):
+        client.locate([client.submit(lambda: 1 / 0)])
 
     test = DistributedTest(init)
     assert isinstance(test, Distributed)
@@ -65,6 +78,43 @@ def test_distributed():
 
     assert test.range(5) == range(5)
 
+    assert test.pure_range(5) == range(5)
+    arange = test.arange(5)
+    assert results(*arange) == (range(5), range(5))
+    assert [ftr.key for ftr in arange] == [ftr.key for ftr in test.arange(5)]
+    assert [ftr.key for ftr in arange] != [ftr.key for ftr in test.arange(4)]
+
+    assert test.batch(("range", (5,)), "ten", ("values",)) == (range(5), 10, (1, 2))
+    test = DistributedTest(init)
+    assert "ten" not in test._constants
+    assert test.batch("ten", "ten", ("range", (5,))) == (10, 10, range(5))
+    assert test.batch("ten", ("range", (4,)), "values") == (10, range(4), (1, 2))
+    value, range5 = test.batch("value", ("range", (5,), {}))
+    assert value.type == int
+    assert range5 == range(5)
+
+    # The batch and the selection of its calls are submitted together
+    submits = []
+
+    def counted(name, method):
+        def wrapper(*args, **kwargs):
+            submits.append(name)
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("get", "map", "submit"):
+        setattr(client, name, counted(name, getattr(client, name)))
+    values = test.batch("value", "value", ("range", (5,)), "values")
+    assert submits == ["get"]
+    assert [val.type for val in values[:2]] == [int, int]
+    assert values[2:] == (range(5), (1, 2))
+    for name in ("get", "map", "submit"):
+        delattr(client, name)
+
+    with raises(ValueError):
+        test.batch(("range", (init,)))
+
     assert test.value.type == int
 
     test.value = "bar"
@@ -73,6 +123,13 @@ def test_distributed():
     with raises(TypeError):
         test(1).wait()
 
+    with raises(TypeError):
+        results(1, next(iter(test(1))))
+
+    with raises(DistributedError) as err:
+        results(*test(1))
+    assert set(err.value.errors) == {0, 1}
+
     assert test[test.workers[0]] is next(iter(test))
 
     with raises(KeyError):
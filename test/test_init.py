@@ -0,0 +1,33 @@
+import sys
+import subprocess
+import lyncs_mpi
+import lyncs_mpi.lib
+from lyncs_mpi import LAZY
+
+
+def test_lazy_import():
+    heavy = ("cppyy", "dask", "distributed", "mpi4py", "sh")
+    code = f"import sys, lyncs_mpi; print(*(m for m in {heavy} if m in sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.split() == []
+
+
+def test_lazy_attributes():
+    for key, module in LAZY.items():
+        value = getattr(lyncs_mpi, key)
+        if module is None:
+            assert value is sys.modules[f"lyncs_mpi.{key}"]
+        else:
+            assert key in sys.modules[f"lyncs_mpi.{module}"].__all__
+    for module in ("client", "comm", "distributed", "cartesian", "lib", "instrument"):
+        for key in sys.modules[f"lyncs_mpi.{module}"].__all__:
+            assert key in lyncs_mpi.__all__
+    assert set(LAZY) <= set(dir(lyncs_mpi))
+    assert lyncs_mpi.lib is sys.modules["lyncs_mpi.lib"]
+    assert lyncs_mpi.lib.lib is lyncs_mpi.get_lib()
+    # the instance is not shadowed by the module of the instrumentation
+    assert isinstance(lyncs_mpi.stats, lyncs_mpi.Stats)
+    assert callable(lyncs_mpi.lib.MPI_Initialized)
+    assert lyncs_mpi.CartComm.zeros
@@ -1,9 +1,9 @@
-from lyncs_mpi import initialized, finalized
+from lyncs_mpi import initialized, finalized, default_comm
 
 
 def test_init():
     if not initialized():
-        initialize()
+        default_comm()
     from mpi4py import MPI
 
     assert initialized() == True
@@ -0,0 +1,43 @@
+from lyncs_mpi import Client, stats
+from lyncs_mpi.instrument import Stats
+from lyncs_mpi.testing import DistributedTest
+
+
+def test_stats():
+    client = Client(2)
+    test = DistributedTest(client.scatter((1, 2)))
+
+    assert not stats.enabled
+    test.range(5)
+    assert not stats.records
+
+    with stats:
+        assert stats.enabled
+        assert test.range(5) == range(5)
+        assert test.values() == (1, 2)
+        test.value.wait()
+    assert not stats.enabled
+
+    phases = {phase for method, phase in stats.records if method == "range"}
+    assert phases == {"dispatch", "submit", "finalize", "gather"}
+    assert stats.records["values", "submit"].count == 1
+    assert stats.records["values", "gather"].nbytes > 0
+    assert ("value", "submit") in stats.records
+
+    stats.gather(client)
+    assert stats.records["range", "execute"].count == 2
+    assert stats.records["values", "execute"].count == 2
+
+    summary = stats.summary().splitlines()
+    assert summary[0].startswith("method")
+    assert len(summary) == len(stats.records) + 1
+
+    metrics = stats.prometheus()
+    assert "# TYPE lyncs_mpi_call_seconds histogram" in metrics
+    assert 'lyncs_mpi_call_seconds_count{method="range",phase="execute"} 2' in metrics
+    assert 'le="+Inf"} 2' in metrics
+    assert 'lyncs_mpi_call_bytes{method="values",phase="gather"}' in metrics
+
+    stats.reset()
+    assert not stats.records
+    assert not Stats().gather(client).records